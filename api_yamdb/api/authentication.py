@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .metrics import record_cache
+
+CACHED_USER_FIELDS = ('id', 'username', 'role', 'is_staff', 'is_active')
+
+USER_CHANGED_KEY = 'api:user:changed:{}'
+
+
+class UserCache:
+    """
+    Ограниченный по размеру LRU-кэш полей пользователя с истечением
+    записей по времени. Живёт в памяти процесса, поэтому каждая
+    запись хранит версию пользователя из общего кэша на момент
+    чтения из базы: если другой воркер изменил пользователя, версии
+    не совпадут и запись не используется.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is None or entry[0] < time.monotonic()
+                    or entry[1] != version):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, version=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version,
+                                  value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+user_cache = UserCache(maxsize=settings.USER_CACHE_SIZE,
+                       ttl=settings.USER_CACHE_TTL)
+
+
+def get_user_version(user_id):
+    """Время последнего изменения пользователя из общего кэша,
+    None, если он не менялся последние USER_CACHE_TTL секунд."""
+    return caches[settings.USER_CACHE_ALIAS].get(
+        USER_CHANGED_KEY.format(user_id)
+    )
+
+
+def mark_user_changed(user_id):
+    # Ключ нужен не дольше ttl: записи, прочитанные до изменения,
+    # к этому времени истекут во всех воркерах.
+    caches[settings.USER_CACHE_ALIAS].set(
+        USER_CHANGED_KEY.format(user_id), time.time(), user_cache.ttl
+    )
+    user_cache.invalidate(user_id)
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает пользователя в этом воркере сразу, а в остальных
+    после коммита, иначе другой воркер успеет закэшировать
+    незаписанные данные с новой версией."""
+    user_id = str(getattr(instance, api_settings.USER_ID_FIELD))
+    user_cache.invalidate(user_id)
+    transaction.on_commit(lambda: mark_user_changed(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, который берёт поля пользователя, нужные
+    для проверки прав, из user_cache вместо запроса к базе.
+    Остальные поля модели отложены и подгрузятся при обращении.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        version = get_user_version(user_id)
+        values = user_cache.get(user_id, version)
+        record_cache('user', values is not None)
+        if values is None:
+            values = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values(*CACHED_USER_FIELDS).first()
+            if values is None:
+                raise AuthenticationFailed(_('User not found'),
+                                           code='user_not_found')
+            user_cache.set(user_id, values, version)
+
+        if not values['is_active']:
+            raise AuthenticationFailed(_('User is inactive'),
+                                       code='user_inactive')
+
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            list(values),
+            [values[field.attname] for field
+             in self.user_model._meta.concrete_fields
+             if field.attname in values]
+        )
@@ -0,0 +1,313 @@
+import itertools
+import json
+import random
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import (Category, Comment, EmailAndCode, Genre, GenreTitle,
+                            Review, Title, User)
+
+# path — строка или функция от номера запроса, которая заранее
+# создаёт свой объект (например, удаляемый отзыв) и возвращает URL.
+Scenario = namedtuple('Scenario', 'name method path data auth')
+Scenario.__new__.__defaults__ = (None, True)
+
+
+@contextmanager
+def temporary_database():
+    """Временная тестовая база, чтобы замеры не трогали рабочие данные."""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def without_throttling():
+    """Замеры шлют запросы с одного адреса быстрее любых лимитов."""
+    return override_settings(REST_FRAMEWORK=dict(
+        settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+    ))
+
+
+def get_skewed_weights(count, skew):
+    """Веса по закону Ципфа: несколько популярных объектов
+    собирают большую часть отзывов и комментариев."""
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def seed_catalogue(titles=1000, reviews=20000, comments=5000, users=200,
+                   skew=1.2, seed=42):
+    """
+    Заполняет базу синтетическим каталогом с перекошенным
+    распределением отзывов. Возвращает id самого популярного
+    произведения, его первого отзыва и комментария к нему.
+    """
+    rng = random.Random(seed)
+    Category.objects.bulk_create(
+        Category(name=f'Категория {number}', slug=f'category-{number}')
+        for number in range(5)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(20)
+    )
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+        for number in range(users)
+    )
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    user_ids = list(User.objects.values_list('id', flat=True))
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=1900 + number % 120,
+              description=f'Описание произведения {number}',
+              category_id=rng.choice(category_ids))
+        for number in range(titles)
+    )
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id_id=title_id, genre_id_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids, 2)
+    )
+
+    rng.shuffle(title_ids)
+    weights = get_skewed_weights(len(title_ids), skew)
+    total_weight = sum(weights)
+    Review.objects.bulk_create(
+        Review(title_id=title_id, author_id=author_id, text='Отзыв',
+               score=rng.randint(1, 10))
+        for title_id, weight in zip(title_ids, weights)
+        for author_id in rng.sample(
+            user_ids, min(len(user_ids), round(reviews * weight
+                                               / total_weight))
+        )
+    )
+
+    hot_title = title_ids[0]
+    review_ids = list(Review.objects.filter(
+        title_id=hot_title
+    ).order_by('id').values_list('id', flat=True))
+    review_ids += list(Review.objects.exclude(
+        title_id=hot_title
+    ).values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        Comment(review_id_id=review_id, author_id=rng.choice(user_ids),
+                text='Комментарий')
+        for review_id in rng.choices(
+            review_ids,
+            cum_weights=list(itertools.accumulate(
+                get_skewed_weights(len(review_ids), skew)
+            )),
+            k=comments
+        )
+    )
+    call_command('reconcile_counters', stdout=StringIO())
+
+    hot_comment = Comment.objects.filter(
+        review_id=review_ids[0]
+    ).values_list('id', flat=True).first()
+    return {'title': hot_title, 'review': review_ids[0],
+            'comment': hot_comment, 'username': 'user0'}
+
+
+def get_token_payload(number):
+    username = f'bench{number}'
+    return {'username': username,
+            'confirmation_code': EmailAndCode.objects.filter(
+                username=username
+            ).values_list('confirm_code', flat=True).first()}
+
+
+def create_title(number):
+    return Title.objects.create(name=f'Замер {number}', year=2000)
+
+
+def get_new_title_reviews_path(number):
+    """Новое произведение на каждый запрос: второй отзыв автора
+    на то же произведение отклоняется."""
+    return f'/api/v1/titles/{create_title(number).id}/reviews/'
+
+
+def get_new_review_path(number):
+    title = create_title(number)
+    review = Review.objects.create(
+        title=title, author=User.objects.order_by('id').first(),
+        text='Отзыв', score=5
+    )
+    Title.objects.filter(id=title.id).update(score_sum=5, reviews_count=1)
+    return f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+
+
+def get_new_slug_path(model, prefix):
+    def get_path(number):
+        slug = f'bench-delete-{number}'
+        model.objects.create(name=slug, slug=slug)
+        return f'/api/v1/{prefix}/{slug}/'
+    return get_path
+
+
+def get_slug_batch(number, size=10):
+    return [{'name': f'Замер {number}-{index}',
+             'slug': f'bench-{number}-{index}'} for index in range(size)]
+
+
+def get_title_batch(number, size=10):
+    return [{'name': f'Замер {number}-{index}', 'year': 2000,
+             'category': 'category-0', 'genre': ['genre-0', 'genre-1']}
+            for index in range(size)]
+
+
+def get_scenarios(ids):
+    title = f'/api/v1/titles/{ids["title"]}'
+    review = f'{title}/reviews/{ids["review"]}'
+    return [
+        Scenario('titles-list', 'get', '/api/v1/titles/'),
+        Scenario('titles-cursor', 'get', '/api/v1/titles/?cursor='),
+        Scenario('titles-genre', 'get', '/api/v1/titles/?genre=genre-1'),
+        Scenario('titles-search', 'get',
+                 '/api/v1/titles/?search=Произведение'),
+        Scenario('title-detail', 'get', f'{title}/'),
+        Scenario('reviews-list', 'get', f'{title}/reviews/'),
+        Scenario('review-detail', 'get', f'{review}/'),
+        Scenario('comments-list', 'get', f'{review}/comments/'),
+        Scenario('comment-detail', 'get',
+                 f'{review}/comments/{ids["comment"]}/'),
+        Scenario('categories-list', 'get', '/api/v1/categories/'),
+        Scenario('genres-list', 'get', '/api/v1/genres/'),
+        Scenario('users-list', 'get', '/api/v1/users/'),
+        Scenario('user-detail', 'get', f'/api/v1/users/{ids["username"]}/'),
+        Scenario('users-me', 'get', '/api/v1/users/me/'),
+        Scenario('export-titles', 'get', '/api/v1/export/titles/'),
+        Scenario('slow-requests', 'get', '/api/v1/slow-requests/'),
+        Scenario('review-create', 'post', get_new_title_reviews_path,
+                 lambda number: {'text': f'Отзыв {number}', 'score': 7}),
+        Scenario('review-update', 'patch', f'{review}/',
+                 lambda number: {'score': number % 10 + 1}),
+        Scenario('review-delete', 'delete', get_new_review_path),
+        Scenario('comment-create', 'post', f'{review}/comments/',
+                 lambda number: {'text': f'Комментарий {number}'}),
+        Scenario('categories-bulk', 'post', '/api/v1/categories/bulk/',
+                 get_slug_batch),
+        Scenario('category-delete', 'delete',
+                 get_new_slug_path(Category, 'categories')),
+        Scenario('genres-bulk', 'post', '/api/v1/genres/bulk/',
+                 get_slug_batch),
+        Scenario('genre-delete', 'delete',
+                 get_new_slug_path(Genre, 'genres')),
+        Scenario('titles-bulk', 'post', '/api/v1/titles/bulk/',
+                 get_title_batch),
+        Scenario('titles-bulk-update', 'patch', '/api/v1/titles/bulk/',
+                 lambda number: [{'id': ids['title'],
+                                  'name': f'Произведение {number}'}]),
+        Scenario('auth-signup', 'post', '/api/v1/auth/signup/',
+                 lambda number: {'username': f'bench{number}',
+                                 'email': f'bench{number}@yamdb.fake'},
+                 auth=False),
+        Scenario('auth-token', 'post', '/api/v1/auth/token/',
+                 get_token_payload, auth=False),
+    ]
+
+
+def get_percentile(sorted_values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class BenchmarkRunner:
+    """Прогоняет сценарии через тестовый клиент Django в том же
+    процессе и собирает пропускную способность, задержки и число
+    SQL-запросов на запрос."""
+
+    def __init__(self, requests=200, warmup=20):
+        self.requests = requests
+        self.warmup = warmup
+        admin, _ = User.objects.get_or_create(
+            username='bench-admin',
+            defaults={'email': 'bench-admin@yamdb.fake', 'role': 'admin'}
+        )
+        self.clients = {
+            True: Client(HTTP_AUTHORIZATION=(
+                f'Bearer {AccessToken.for_user(admin)}'
+            )),
+            False: Client(),
+        }
+
+    def send(self, scenario, request):
+        path, data = request
+        send = getattr(self.clients[scenario.auth], scenario.method)
+        started = time.perf_counter()
+        if scenario.method in ('get', 'delete'):
+            response = send(path)
+        else:
+            response = send(path, json.dumps(data),
+                            content_type='application/json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if response.status_code >= 400:
+            raise AssertionError(
+                f'{scenario.name}: статус {response.status_code}'
+            )
+        return time.perf_counter() - started
+
+    def run(self, scenario):
+        # URL и тела запросов готовятся заранее, чтобы их запросы
+        # к базе не попадали ни в задержки, ни в счётчик SQL.
+        requests = [
+            (scenario.path(number) if callable(scenario.path)
+             else scenario.path,
+             scenario.data(number) if scenario.data else None)
+            for number in range(self.warmup + 1 + self.requests)
+        ]
+        for request in requests[:self.warmup]:
+            self.send(scenario, request)
+        with CaptureQueriesContext(connection) as context:
+            self.send(scenario, requests[self.warmup])
+        # captured_queries читает connection.queries лениво, а следующий
+        # запрос очистит журнал сигналом request_started.
+        queries = len(context.captured_queries)
+        latencies = sorted(self.send(scenario, request)
+                           for request in requests[self.warmup + 1:])
+        return {
+            'requests': self.requests,
+            'throughput': self.requests / sum(latencies),
+            'mean_ms': sum(latencies) / len(latencies) * 1000,
+            'p50_ms': get_percentile(latencies, 50) * 1000,
+            'p95_ms': get_percentile(latencies, 95) * 1000,
+            'p99_ms': get_percentile(latencies, 99) * 1000,
+            'queries': queries,
+        }
+
+
+def measure_render(renderer, data, repeat=20):
+    """Лучшее и среднее время рендеринга страницы и пик памяти,
+    выделенной на один рендеринг."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = renderer.render(data, 'application/json')
+        durations.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        renderer.render(data, 'application/json')
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'best_ms': min(durations) * 1000,
+        'mean_ms': sum(durations) / len(durations) * 1000,
+        'peak_kb': peak / 1024,
+        'size_kb': len(content) / 1024,
+    }
@@ -0,0 +1,241 @@
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from reviews.models import Category, Genre, GenreTitle
+
+from .cache import invalidate_catalogue
+from .serializers import BulkSlugSerializer, BulkTitleSerializer
+
+TITLE_FIELDS = ('name', 'year', 'description', 'category')
+
+
+def success(data):
+    return {'status': status.HTTP_200_OK, 'data': data}
+
+
+def failure(errors):
+    return {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+
+
+class BulkWriter:
+    """Создаётся на каждый запрос и хранит разрешённые slug'и пачки."""
+
+    serializer_class = None
+
+    def __init__(self, model):
+        self.model = model
+
+
+class SlugBulkWriter(BulkWriter):
+    """Пакетное создание и переименование жанров и категорий."""
+
+    serializer_class = BulkSlugSerializer
+
+    def create(self, items):
+        slugs = [data['slug'] for _, data in items]
+        taken = set(self.model.objects.filter(
+            slug__in=slugs
+        ).values_list('slug', flat=True))
+        results = {}
+        objects = []
+        for index, data in items:
+            if data['slug'] in taken:
+                results[index] = failure(
+                    {'slug': ['Объект с таким slug уже существует']}
+                )
+                continue
+            taken.add(data['slug'])
+            objects.append(self.model(**data))
+            results[index] = success(dict(data))
+        self.model.objects.bulk_create(objects)
+        return results
+
+    def update(self, items):
+        existing = self.model.objects.in_bulk(
+            [data['slug'] for _, data in items if 'slug' in data],
+            field_name='slug'
+        )
+        results = {}
+        changed = {}
+        for index, data in items:
+            instance = existing.get(data.get('slug'))
+            if instance is None:
+                results[index] = failure({'slug': ['Объект не найден']})
+                continue
+            instance.name = data.get('name', instance.name)
+            changed[instance.slug] = instance
+            results[index] = success(
+                {'name': instance.name, 'slug': instance.slug}
+            )
+        self.model.objects.bulk_update(changed.values(), ['name'])
+        return results
+
+
+class TitleBulkWriter(BulkWriter):
+    """
+    Пакетное создание и изменение произведений: slug'и категорий
+    и жанров всей пачки разрешаются двумя запросами, связи
+    с жанрами вставляются одним bulk_create.
+    """
+
+    serializer_class = BulkTitleSerializer
+
+    def resolve(self, items):
+        self.categories = Category.objects.in_bulk(
+            {data['category'] for _, data in items if 'category' in data},
+            field_name='slug'
+        )
+        self.genres = Genre.objects.in_bulk(
+            {slug for _, data in items for slug in data.get('genre', ())},
+            field_name='slug'
+        )
+
+    def get_errors(self, data):
+        errors = {}
+        if 'category' in data and data['category'] not in self.categories:
+            errors['category'] = [f'Категория {data["category"]} не найдена']
+        unknown = [slug for slug in data.get('genre', ())
+                   if slug not in self.genres]
+        if unknown:
+            errors['genre'] = [f'Жанр {slug} не найден' for slug in unknown]
+        return errors
+
+    def apply(self, title, data):
+        for field in ('name', 'year', 'description'):
+            if field in data:
+                setattr(title, field, data[field])
+        if 'category' in data:
+            title.category = self.categories[data['category']]
+
+    def link_genres(self, titles_with_genres):
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title, genre_id=self.genres[slug])
+            for title, slugs in titles_with_genres
+            for slug in dict.fromkeys(slugs)
+        )
+
+    def represent(self, title, data):
+        representation = {field: getattr(title, field)
+                          for field in ('id', 'name', 'year', 'description')}
+        representation['category'] = (title.category.slug
+                                      if title.category else None)
+        if 'genre' in data:
+            representation['genre'] = data['genre']
+        return representation
+
+    def create(self, items):
+        self.resolve(items)
+        results = {}
+        created = []
+        for index, data in items:
+            errors = self.get_errors(data)
+            if errors:
+                results[index] = failure(errors)
+                continue
+            title = self.model()
+            self.apply(title, data)
+            created.append((index, title, data))
+        self.save_new([title for _, title, _ in created])
+        self.link_genres((title, data['genre']) for _, title, data in created)
+        for index, title, data in created:
+            results[index] = success(self.represent(title, data))
+        return results
+
+    def save_new(self, titles):
+        # В Django 2.2 bulk_create возвращает id только на PostgreSQL,
+        # а без id нельзя вставить связи с жанрами.
+        if connection.features.can_return_ids_from_bulk_insert:
+            self.model.objects.bulk_create(titles)
+            return
+        for title in titles:
+            title.save()
+
+    def update(self, items):
+        self.resolve(items)
+        existing = self.model.objects.select_related('category').in_bulk(
+            [data['id'] for _, data in items if 'id' in data]
+        )
+        results = {}
+        updated = {}
+        for index, data in items:
+            title = existing.get(data.get('id'))
+            errors = self.get_errors(data)
+            if title is None:
+                errors['id'] = ['Произведение не найдено']
+            if errors:
+                results[index] = failure(errors)
+                continue
+            self.apply(title, data)
+            updated[title.id] = (title, data)
+            results[index] = success(self.represent(title, data))
+        self.model.objects.bulk_update(
+            [title for title, _ in updated.values()], TITLE_FIELDS
+        )
+        relinked = [(title, data['genre']) for title, data in updated.values()
+                    if 'genre' in data]
+        GenreTitle.objects.filter(
+            title_id__in=[title for title, _ in relinked]
+        ).delete()
+        self.link_genres(relinked)
+        return results
+
+
+class BulkWriteMixin:
+    """
+    Добавляет /bulk/: POST создаёт, PATCH изменяет список объектов.
+    Ошибочные элементы не прерывают пачку, а возвращаются
+    на своих позициях; остальные записываются одной транзакцией.
+    """
+
+    bulk_writer_class = None
+
+    def get_bulk_writer(self):
+        return self.bulk_writer_class(self.queryset.model)
+
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'detail': 'Ожидается список объектов'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BULK_WRITE_MAX_ITEMS:
+            return Response(
+                {'detail': 'Слишком много объектов, максимум '
+                           f'{settings.BULK_WRITE_MAX_ITEMS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        partial = request.method == 'PATCH'
+        writer = self.get_bulk_writer()
+        results = {}
+        valid = []
+        for index, item in enumerate(items):
+            serializer = writer.serializer_class(data=item, partial=partial)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = failure(serializer.errors)
+        if valid:
+            with transaction.atomic():
+                write = writer.update if partial else writer.create
+                results.update(write(valid))
+                # bulk_create и bulk_update не отправляют сигналы.
+                invalidate_catalogue()
+        return self.get_bulk_response(
+            [results[index] for index in range(len(items))], partial
+        )
+
+    @staticmethod
+    def get_bulk_response(results, partial):
+        failed = sum(result['status'] != status.HTTP_200_OK
+                     for result in results)
+        if results and failed == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif partial:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(results, status=response_status)
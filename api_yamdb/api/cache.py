@@ -0,0 +1,116 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, urlencode
+
+from .metrics import record_cache
+from .replicas import pin_primary, replica_may_lag
+
+CATALOGUE_VERSION_KEY = 'api:catalogue:version'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_catalogue_version():
+    """Время последнего изменения каталога, оно же Last-Modified
+    и часть ключа кэша: после изменения старые ключи не читаются."""
+    cache = get_cache()
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is not None:
+        return version
+    cache.add(CATALOGUE_VERSION_KEY, int(time.time()), None)
+    return cache.get(CATALOGUE_VERSION_KEY) or int(time.time())
+
+
+def bump_catalogue_version():
+    cache = get_cache()
+    version = max(int(time.time()),
+                  (cache.get(CATALOGUE_VERSION_KEY) or 0) + 1)
+    cache.set(CATALOGUE_VERSION_KEY, version, None)
+
+
+def invalidate_catalogue(**kwargs):
+    """Сдвигает версию после коммита, иначе параллельный запрос
+    успеет закэшировать данные, которые ещё не записаны."""
+    transaction.on_commit(bump_catalogue_version)
+
+
+def get_response_cache_key(request, version):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = request.build_absolute_uri(request.path)
+    raw_key = f'{request.accepted_media_type}|{url}?{query}'
+    digest = hashlib.md5(raw_key.encode()).hexdigest()
+    return f'api:response:{version}:{digest}'
+
+
+class ResponseCacheMixin:
+    """
+    Кэширует отрендеренные ответы чтения по нормализованному URL
+    и отдаёт ETag и Last-Modified, чтобы клиенты получали 304.
+    Кэш сбрасывается сигналами из api.signals. Кэшируется только
+    JSON: страница браузерного API содержит имя пользователя и его
+    CSRF-токен.
+    """
+    cached_formats = ('json',)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format not in self.cached_formats:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        version = get_catalogue_version()
+        key = get_response_cache_key(request, version)
+        cached = cache.get(key)
+        record_cache('response', cached is not None)
+        if cached is None:
+            if replica_may_lag(version):
+                # Реплика могла ещё не получить изменение, которое
+                # сменило версию, и её ответ остался бы в кэше.
+                pin_primary()
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(
+                    hashlib.md5(response.content).hexdigest()
+                ),
+            }
+            cache.set(key, cached, settings.RESPONSE_CACHE_TIMEOUT)
+        response = HttpResponse(cached['content'],
+                                content_type=cached['content_type'])
+        response['ETag'] = cached['etag']
+        response['Last-Modified'] = http_date(version)
+        return get_conditional_response(
+            request._request,
+            etag=cached['etag'],
+            last_modified=version,
+            response=response
+        )
+
+
+class CachedListMixin(ResponseCacheMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(ResponseCacheMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
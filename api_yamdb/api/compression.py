@@ -0,0 +1,138 @@
+import gzip
+import io
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'application/yaml',
+    'image/svg+xml',
+    'text/',
+)
+
+# Ответы API сжимаются на лету, поэтому уровни средние. Статика
+# сжимается один раз при collectstatic, ей достаются максимальные.
+RESPONSE_LEVELS = {'br': 5, 'gzip': 6}
+STATIC_LEVELS = {'br': 11, 'gzip': 9}
+STATIC_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def get_encodings():
+    """Кодировки в порядке предпочтения: brotli, если установлен."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def parse_accept_encoding(header):
+    """Кодировка → q из заголовка Accept-Encoding."""
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities
+
+
+def choose_encoding(header):
+    qualities = parse_accept_encoding(header)
+    for encoding in get_encodings():
+        if qualities.get(encoding, qualities.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # mtime=0: одинаковые данные дают одинаковый архив.
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=level,
+                       mtime=0) as archive:
+        archive.write(data)
+    return buffer.getvalue()
+
+
+def compress_stream(chunks, encoding, level):
+    """Сжимает поток по мере чтения, отдавая сжатое после каждого
+    куска, чтобы клиент получал данные, не дожидаясь конца выгрузки."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=level,
+                       mtime=0) as archive:
+        for chunk in chunks:
+            archive.write(chunk)
+            archive.flush()
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(';')[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Сжимает текстовые ответы brotli или gzip по Accept-Encoding.
+    Ответы меньше COMPRESSION_MIN_SIZE байт отдаются как есть:
+    заголовки и накладные расходы сжатия съели бы выигрыш.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or not is_compressible(response.get('Content-Type', ''))):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING',
+                                                    ''))
+        if encoding is None:
+            return response
+
+        level = RESPONSE_LEVELS[encoding]
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level
+            )
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело отличается побайтно, но не по смыслу.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
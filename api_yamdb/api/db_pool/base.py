@@ -0,0 +1,123 @@
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import Error as DatabaseError
+from psycopg2 import OperationalError
+from psycopg2.pool import ThreadedConnectionPool
+
+pools = {}
+pools_lock = threading.Lock()
+dropped_connections = {}
+
+
+class PoolTimeout(OperationalError):
+    """Ни одно соединение пула не освободилось за POOL_TIMEOUT.
+    Django превращает его в django.db.OperationalError, а
+    LoadSheddingMiddleware отвечает на него 503."""
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool, который при занятом пуле ждёт
+    освободившееся соединение до timeout секунд, а не сразу бросает
+    PoolError: потоков в воркере может быть больше, чем соединений.
+    """
+
+    def __init__(self, minconn, maxconn, timeout, *args, **kwargs):
+        self.timeout = timeout
+        self.available = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self.available.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'Нет свободного соединения в пуле за {self.timeout} с'
+            )
+        try:
+            return super().getconn(key)
+        except Exception:
+            self.available.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        self.available.release()
+
+
+def get_pool(alias, conn_params, size, timeout):
+    # psycopg2 держит свободными не больше minconn соединений,
+    # остальные при возврате закрывает, поэтому minconn = size.
+    with pools_lock:
+        if alias not in pools:
+            pools[alias] = BlockingConnectionPool(size, size, timeout,
+                                                  **conn_params)
+        return pools[alias]
+
+
+def is_alive(connection):
+    """Проверка при выдаче из пула: после переключения базы
+    соединения в пуле остаются, но уже не работают."""
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except DatabaseError:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Бэкенд PostgreSQL с пулом соединений на процесс для воркеров
+    с потоками. Пул включается ключом POOL_SIZE в DATABASES, без него
+    бэкенд работает как обычный. CONN_MAX_AGE при пуле должен быть 0:
+    в конце запроса Django закрывает соединение, а бэкенд возвращает
+    его в пул вместо разрыва. Если все соединения заняты, поток ждёт
+    свободное до POOL_TIMEOUT секунд.
+    """
+
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        size = self.settings_dict.get('POOL_SIZE')
+        if not size:
+            return super().get_new_connection(conn_params)
+        pool = get_pool(self.alias, conn_params, size,
+                        self.settings_dict.get('POOL_TIMEOUT', 5))
+        connection = pool.getconn()
+        while not is_alive(connection):
+            pool.putconn(connection, close=True)
+            dropped_connections[self.alias] = (
+                dropped_connections.get(self.alias, 0) + 1
+            )
+            connection = pool.getconn()
+        self.pool = pool
+
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        pool, self.pool = self.pool, None
+        with self.wrap_database_errors:
+            # Незавершённую транзакцию пул откатывает сам.
+            return pool.putconn(self.connection)
+
+    def get_pool_stats(self):
+        pool = pools.get(self.alias)
+        if pool is None:
+            return None
+        return {'size': pool.maxconn, 'in_use': len(pool._used),
+                'idle': len(pool._pool),
+                'dropped': dropped_connections.get(self.alias, 0)}
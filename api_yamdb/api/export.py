@@ -0,0 +1,125 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from reviews.models import GenreTitle, Review, Title
+
+EXPORT_CHUNK_SIZE = 2000
+
+TITLE_FIELDS = ('id', 'name', 'year', 'description', 'score_sum',
+                'reviews_count', 'category__name', 'category__slug')
+
+REVIEW_FIELDS = ('id', 'title_id', 'text', 'author__username', 'score',
+                 'pub_date')
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def get_genres(title_ids):
+    genres = {}
+    for title_id, name, slug in GenreTitle.objects.filter(
+        title_id__in=title_ids
+    ).order_by('title_id', 'genre_id__slug').values_list(
+        'title_id', 'genre_id__name', 'genre_id__slug'
+    ):
+        genres.setdefault(title_id, []).append({'name': name, 'slug': slug})
+    return genres
+
+
+class ReviewStream:
+    """
+    Отзывы всего каталога одним серверным курсором в порядке
+    (title_id, pub_date, id). Произведения тоже идут по возрастанию
+    id, поэтому отзывы очередного произведения берутся прямо из
+    курсора, а отзывы произведений, которых уже нет в выгрузке,
+    пропускаются. Отзывы удалённых произведений остаются с пустым
+    title_id и не читаются вовсе.
+    """
+
+    def __init__(self, chunk_size):
+        self.rows = Review.objects.filter(title_id__isnull=False).order_by(
+            'title_id', 'pub_date', 'id'
+        ).values(*REVIEW_FIELDS).iterator(chunk_size=chunk_size)
+        self.current = next(self.rows, None)
+
+    def for_title(self, title_id):
+        while (self.current is not None
+               and self.current['title_id'] < title_id):
+            self.current = next(self.rows, None)
+        while (self.current is not None
+               and self.current['title_id'] == title_id):
+            yield self.current
+            self.current = next(self.rows, None)
+
+
+def represent_review(row):
+    return {'id': row['id'], 'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'], 'pub_date': row['pub_date']}
+
+
+def represent_title(row, genres):
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'year': row['year'],
+        'description': row['description'],
+        'rating': (row['score_sum'] / row['reviews_count']
+                   if row['reviews_count'] else None),
+        'category': ({'name': row['category__name'],
+                      'slug': row['category__slug']}
+                     if row['category__slug'] else None),
+        'genre': genres.get(row['id'], []),
+    }
+
+
+def iter_title_pieces(title, reviews, encoder):
+    """Строка NDJSON произведения по частям: отзывы кодируются
+    по одному и не собираются в список даже у популярных
+    произведений."""
+    if reviews is None:
+        yield encoder.encode(title) + '\n'
+        return
+    yield encoder.encode(title)[:-1] + ', "reviews": ['
+    for index, review in enumerate(reviews.for_title(title['id'])):
+        yield (', ' if index else '') + encoder.encode(
+            represent_review(review)
+        )
+    yield ']}\n'
+
+
+def iter_catalogue(include_reviews=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Построчно отдаёт каталог в NDJSON. Произведения читаются
+    серверным курсором пачками по chunk_size, жанры догружаются
+    одним запросом на пачку, а отзывы читаются вторым курсором
+    параллельно с произведениями, поэтому память не растёт
+    с размером таблиц.
+    """
+    titles = Title.objects.order_by('id').values(
+        *TITLE_FIELDS
+    ).iterator(chunk_size=chunk_size)
+    reviews = ReviewStream(chunk_size) if include_reviews else None
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buffer = []
+    for rows in chunked(titles, chunk_size):
+        genres = get_genres([row['id'] for row in rows])
+        for row in rows:
+            for piece in iter_title_pieces(represent_title(row, genres),
+                                           reviews, encoder):
+                buffer.append(piece)
+                if len(buffer) >= chunk_size:
+                    yield ''.join(buffer)
+                    buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def parse_flag(value):
+    return str(value).lower() in ('1', 'true', 'yes')
@@ -0,0 +1,127 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+
+def parse_field_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_requested_fields(request, available):
+    """
+    Поля из ?fields= без полей из ?omit=. Неизвестные имена
+    пропускаются. None, если ответ отдаётся целиком: параметров нет
+    или запрос не на чтение, ведь при записи поля нужны для проверки.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = request.query_params.get(FIELDS_QUERY_PARAM)
+    omit = request.query_params.get(OMIT_QUERY_PARAM)
+    if not fields and not omit:
+        return None
+    requested = set(available)
+    if fields:
+        requested &= parse_field_names(fields)
+    if omit:
+        requested -= parse_field_names(omit)
+    return requested
+
+
+class SparseFieldsMixin:
+    """
+    Сериализатор, который отдаёт только поля, запрошенные через
+    ?fields= и ?omit=. Поля, значения которых берутся не из одноимённых
+    колонок, перечисляются в Meta.field_columns, чтобы
+    SparseQuerysetMixin знал, что для них выбрать из базы.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(
+            self.context.get('request'), self.fields
+        )
+        if requested is None:
+            return
+        for name in set(self.fields) - requested:
+            self.fields.pop(name)
+
+
+def get_lookup_root(lookup):
+    if isinstance(lookup, Prefetch):
+        lookup = lookup.prefetch_through
+    return lookup.split('__')[0]
+
+
+def prune_queryset(queryset, serializer, extra_columns=()):
+    """
+    Оставляет в SELECT только колонки полей сериализатора, а JOIN
+    и prefetch только для запрошенных связей. Если источник поля
+    нельзя сопоставить с моделью, queryset не меняется.
+    """
+    model = queryset.model
+    field_columns = getattr(serializer.Meta, 'field_columns', {})
+    # Связанный менеджер сверяет внешний ключ каждой строки
+    # с объектом-владельцем, поэтому ключ нужен всегда.
+    columns = {model._meta.pk.name, *extra_columns,
+               *[field.name for field in queryset._known_related_objects]}
+    relations = set()
+    for name, field in serializer.fields.items():
+        if name in field_columns:
+            columns.update(field_columns[name])
+            continue
+        source = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return queryset
+        if model_field.is_relation:
+            relations.add(source)
+        if model_field.concrete and not model_field.many_to_many:
+            columns.add(source)
+
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        queryset = queryset.select_related(None).select_related(
+            *[name for name in select_related if name in relations]
+        )
+    prefetches = queryset._prefetch_related_lookups
+    if prefetches:
+        queryset = queryset.prefetch_related(None).prefetch_related(
+            *[lookup for lookup in prefetches
+              if get_lookup_root(lookup) in relations]
+        )
+    return queryset.only(*columns)
+
+
+class SparseQuerysetMixin:
+    """
+    Для ?fields= и ?omit= урезает queryset вьюсета под поля, которые
+    останутся в ответе. Поля сортировки курсорной пагинации и
+    ?ordering= выбираются всегда: по ним строится ссылка на следующую
+    страницу.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if (self.request.method not in SAFE_METHODS
+                or not {FIELDS_QUERY_PARAM, OMIT_QUERY_PARAM} & set(params)):
+            return queryset
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context()
+        )
+        if not isinstance(serializer, SparseFieldsMixin):
+            return queryset
+        return prune_queryset(queryset, serializer,
+                              self.get_sort_fields(queryset))
+
+    def get_sort_fields(self, queryset):
+        ordering = list(getattr(self, 'cursor_ordering', ()))
+        for backend in getattr(self, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering += backend().get_ordering(self.request, queryset,
+                                                   self) or ()
+        return [field.lstrip('-') for field in ordering]
@@ -1,15 +1,39 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
-    genre = filters.CharFilter(field_name='genres__slug',
-                               lookup_expr='contains')
-    category = filters.CharFilter(field_name='category__slug',
-                                  lookup_expr='contains')
+    genre = filters.CharFilter(field_name='genres__slug')
+    genre__startswith = filters.CharFilter(field_name='genres__slug',
+                                           lookup_expr='startswith',
+                                           distinct=True)
+    category = filters.CharFilter(field_name='category__slug')
+    category__startswith = filters.CharFilter(field_name='category__slug',
+                                              lookup_expr='startswith')
     name = filters.CharFilter(field_name='name',
                               lookup_expr='contains')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ('genre', 'category', 'year', 'name')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    ?ordering= с добавленным в конец id: строки с равными счётчиками
+    не переставляются между страницами, а курсор однозначно указывает
+    на последнюю запись страницы.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering or any(field.lstrip('-') in ('id', 'pk')
+                               for field in ordering):
+            return ordering
+        return (*ordering, 'id')
@@ -0,0 +1,94 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connection, connections
+from django.http import JsonResponse
+
+connection_stats = {'requests': 0, 'reused': 0, 'opened': 0, 'dropped': 0}
+stats_lock = threading.Lock()
+
+
+def count_stat(name):
+    with stats_lock:
+        connection_stats[name] += 1
+
+
+def count_new_connection(sender, connection, **kwargs):
+    count_stat('opened')
+
+
+def check_connections(**kwargs):
+    """
+    Вызывается в начале запроса после close_old_connections Django.
+    Постоянное соединение, пережившее прошлый запрос, помечается
+    непроверенным: перед первым обращением к базе в этом запросе оно
+    проверяется запросом SELECT 1 и закрывается, если база его уже
+    разорвала, например после переключения на реплику. Запросы,
+    которые до базы не доходят, проверку не ждут.
+    """
+    count_stat('requests')
+    for db in connections.all():
+        if db.connection is None or db.in_atomic_block:
+            continue
+        count_stat('reused')
+        if settings.DB_CONN_HEALTH_CHECKS:
+            install_health_check(db)
+            db.health_check_pending = True
+
+
+def install_health_check(db):
+    """Оборачивает ensure_connection соединения, через который
+    проходит каждый курсор, проверкой отложенного SELECT 1."""
+    if getattr(db, 'health_check_pending', None) is not None:
+        return
+    ensure_connection = db.ensure_connection
+
+    def ensure_checked_connection():
+        if db.health_check_pending:
+            db.health_check_pending = False
+            if (db.connection is not None and not db.in_atomic_block
+                    and not db.is_usable()):
+                db.close()
+                count_stat('dropped')
+        ensure_connection()
+
+    db.ensure_connection = ensure_checked_connection
+
+
+def get_connection_report():
+    with stats_lock:
+        report = dict(connection_stats)
+    report['reuse_ratio'] = (report['reused'] / report['requests']
+                             if report['requests'] else 0)
+    report['conn_max_age'] = connection.settings_dict['CONN_MAX_AGE']
+    report['health_checks'] = settings.DB_CONN_HEALTH_CHECKS
+    return report
+
+
+def readiness_view(request):
+    """Готовность принимать трафик: база и кэш отвечают. Статистика
+    соединений и пула относится к процессу, который ответил."""
+    checks = {}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        checks['database'] = 'ok'
+    except DatabaseError as error:
+        checks['database'] = f'error: {error}'
+    cache = caches[settings.RESPONSE_CACHE_ALIAS]
+    try:
+        cache.set('api:health', 'ok', 10)
+        checks['cache'] = cache.get('api:health') or 'error: no value'
+    except Exception as error:
+        checks['cache'] = f'error: {error}'
+    get_pool_stats = getattr(connection, 'get_pool_stats', None)
+    ready = all(value == 'ok' for value in checks.values())
+    return JsonResponse(
+        {'status': 'ok' if ready else 'error',
+         'checks': checks,
+         'connections': get_connection_report(),
+         'pool': get_pool_stats() if get_pool_stats else None},
+        status=200 if ready else 503,
+        json_dumps_params={'ensure_ascii': False}
+    )
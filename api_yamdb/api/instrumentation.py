@@ -0,0 +1,151 @@
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+SLOWEST_QUERIES_KEPT = 10
+
+slow_request_log = deque(maxlen=settings.SLOW_REQUEST_LOG_SIZE)
+
+
+def get_view_name(view_func, request):
+    """
+    Имя обработчика вида TitleViewSet.list, а не путь запроса,
+    чтобы число различных значений не зависело от id в URL.
+    """
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', type(view_func).__name__)
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view_class.__name__}.{action}'
+    return view_class.__name__
+
+
+class RequestStats:
+    """Обёртка выполнения SQL, которая считает запросы и их время
+    и хранит самые медленные из них."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_name = None
+        self.view_started = None
+        self.view_finished = None
+        self.render_finished = None
+        self.timings = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = []
+        self._order = itertools.count()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += duration
+            entry = (duration, next(self._order), sql)
+            if len(self.slowest) < SLOWEST_QUERIES_KEPT:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+    def get_timings(self, finished):
+        """Интервалы в миллисекундах: база, вью, рендеринг, всего."""
+        view_finished = self.view_finished or finished
+        view_started = self.view_started or self.started
+        timings = {
+            'db': self.db_time * 1000,
+            'view': (view_finished - view_started) * 1000,
+        }
+        if self.view_finished and self.render_finished:
+            timings['render'] = (
+                self.render_finished - self.view_finished
+            ) * 1000
+        timings['total'] = (finished - self.started) * 1000
+        return timings
+
+    def get_server_timing(self, timings):
+        metrics = []
+        for name, duration in timings.items():
+            metric = f'{name};dur={duration:.2f}'
+            if name == 'db':
+                metric += f';desc="{self.queries} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+    def get_slow_queries(self, threshold):
+        return [{'sql': sql, 'duration_ms': round(duration * 1000, 2)}
+                for duration, _, sql in sorted(self.slowest, reverse=True)
+                if duration * 1000 >= threshold]
+
+
+class RequestTimingMiddleware:
+    """
+    Замеряет время SQL, вью и рендеринга каждого запроса. При
+    SERVER_TIMING добавляет заголовок Server-Timing, медленные
+    запросы складывает в ограниченный буфер slow_request_log,
+    который отдаёт /api/v1/slow-requests/. Буфер свой у каждого
+    процесса.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = request.timing_stats = RequestStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        timings = stats.timings = stats.get_timings(time.perf_counter())
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = stats.get_server_timing(timings)
+        self.log_slow_request(request, response, stats, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing_stats.view_name = get_view_name(view_func, request)
+        request.timing_stats.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        stats = request.timing_stats
+        stats.view_finished = time.perf_counter()
+
+        def mark_rendered(response):
+            stats.render_finished = time.perf_counter()
+
+        response.add_post_render_callback(mark_rendered)
+        return response
+
+    @staticmethod
+    def log_slow_request(request, response, stats, timings):
+        # У медленного запроса сохраняются его самые долгие SQL,
+        # у быстрого только те, что сами превысили порог.
+        request_is_slow = (
+            timings['total'] >= settings.SLOW_REQUEST_THRESHOLD_MS
+        )
+        slow_queries = stats.get_slow_queries(
+            0 if request_is_slow else settings.SLOW_QUERY_THRESHOLD_MS
+        )
+        if not request_is_slow and not slow_queries:
+            return
+        slow_request_log.append({
+            'time': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'view': stats.view_name,
+            'status': response.status_code,
+            'queries': stats.queries,
+            'timings_ms': {name: round(duration, 2)
+                           for name, duration in timings.items()},
+            'slow_queries': slow_queries,
+        })
@@ -0,0 +1,94 @@
+import json
+import platform
+
+from api.benchmarks import (BenchmarkRunner, get_scenarios, seed_catalogue,
+                            temporary_database, without_throttling)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+COLUMNS = ('throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'queries')
+
+
+class Command(BaseCommand):
+    help = ('Заполняет временную тестовую базу синтетическим каталогом '
+            'и замеряет пропускную способность, задержки и число '
+            'SQL-запросов для каждого маршрута API. Кэш ответов '
+            'работает так же, как в рабочем окружении.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000,
+                            help='Количество произведений')
+        parser.add_argument('--reviews', type=int, default=20000,
+                            help='Общее количество отзывов')
+        parser.add_argument('--comments', type=int, default=5000,
+                            help='Общее количество комментариев')
+        parser.add_argument('--users', type=int, default=200,
+                            help='Количество авторов отзывов')
+        parser.add_argument('--skew', type=float, default=1.2,
+                            help='Показатель перекоса распределения отзывов')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Зерно генератора данных')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Количество замеряемых запросов на маршрут')
+        parser.add_argument('--warmup', type=int, default=20,
+                            help='Количество запросов для прогрева')
+        parser.add_argument('--only', nargs='+', metavar='NAME',
+                            help='Запустить только указанные сценарии')
+        parser.add_argument('--output', metavar='PATH',
+                            help='Сохранить результаты в JSON')
+        parser.add_argument('--compare', metavar='PATH',
+                            help='Сравнить с результатами прошлого запуска')
+
+    def handle(self, *args, **options):
+        dataset = {name: options[name] for name in
+                   ('titles', 'reviews', 'comments', 'users', 'skew', 'seed')}
+        with temporary_database(), without_throttling():
+            ids = seed_catalogue(**dataset)
+            runner = BenchmarkRunner(options['requests'], options['warmup'])
+            scenarios = [scenario for scenario in get_scenarios(ids)
+                         if not options['only']
+                         or scenario.name in options['only']]
+            if not scenarios:
+                raise CommandError('Нет сценариев с такими именами')
+            results = {}
+            for scenario in scenarios:
+                results[scenario.name] = runner.run(scenario)
+                self.write_row(scenario.name, results[scenario.name])
+        report = {
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'dataset': dataset,
+            'requests': options['requests'],
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def write_row(self, name, result):
+        self.stdout.write(
+            f'{name:<18} {result["throughput"]:>9.1f} запр/с  '
+            f'p50 {result["p50_ms"]:>7.2f} мс  '
+            f'p95 {result["p95_ms"]:>7.2f} мс  '
+            f'p99 {result["p99_ms"]:>7.2f} мс  '
+            f'SQL {result["queries"]}'
+        )
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Сравнение с {path}'))
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            changes = []
+            for column in COLUMNS:
+                before = baseline[name][column]
+                change = ((result[column] - before) / before * 100
+                          if before else 0)
+                changes.append(f'{column} {change:+.1f}%')
+            self.stdout.write(f'{name:<18} ' + '  '.join(changes))
@@ -0,0 +1,50 @@
+import time
+
+from api.benchmarks import temporary_database, without_throttling
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from reviews.models import EmailAndCode
+
+
+class Command(BaseCommand):
+    help = ('Измеряет запросы в секунду и число SQL-запросов '
+            'для регистрации и получения токена на временной тестовой базе')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Количество регистраций и обменов кода')
+
+    def handle(self, *args, **options):
+        with temporary_database(), without_throttling():
+            count = options['requests']
+            client = Client()
+            self.report('signup', count, lambda number: client.post(
+                '/api/v1/auth/signup/',
+                {'username': f'bench{number}',
+                 'email': f'bench{number}@yamdb.fake'}
+            ))
+            codes = dict(EmailAndCode.objects.values_list(
+                'username', 'confirm_code'
+            ))
+            self.report('token', count, lambda number: client.post(
+                '/api/v1/auth/token/',
+                {'username': f'bench{number}',
+                 'confirmation_code': codes[f'bench{number}']}
+            ))
+
+    def report(self, name, count, send_request):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            for number in range(count):
+                response = send_request(number)
+                if response.status_code != 200:
+                    raise AssertionError(
+                        f'{name}: статус {response.status_code}'
+                    )
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {count / elapsed:.1f} запросов/с, '
+            f'{len(context.captured_queries) / count:.2f} SQL на запрос'
+        )
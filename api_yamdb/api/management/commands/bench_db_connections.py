@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+
+from api.benchmarks import get_percentile, seed_catalogue, temporary_database
+from api.health import connection_stats
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+
+MODES = (
+    ('new-connection', {'CONN_MAX_AGE': 0, 'POOL_SIZE': 0}),
+    ('persistent', {'CONN_MAX_AGE': 600, 'POOL_SIZE': 0}),
+    ('pooled', {'CONN_MAX_AGE': 0, 'POOL_SIZE': 4}),
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает задержку запроса к API при новом соединении '
+            'с базой на каждый запрос, постоянных соединениях '
+            'и пуле соединений (бэкенд api.db_pool)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Количество запросов в каждом режиме')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            # База в памяти исчезает вместе с последним соединением.
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = (
+                os.path.join(tempfile.gettempdir(), 'bench_connections.db')
+            )
+        with temporary_database():
+            ids = seed_catalogue(titles=50, reviews=500, comments=50,
+                                 users=20)
+            path = f'/api/v1/titles/{ids["title"]}/reviews/'
+            for name, overrides in MODES:
+                if overrides['POOL_SIZE'] and not hasattr(
+                    connection, 'get_pool_stats'
+                ):
+                    self.stdout.write(f'{name}: пропущен, нужен '
+                                      'DB_ENGINE=api.db_pool')
+                    continue
+                connection.close()
+                connection.settings_dict.update(overrides)
+                self.report(name, path, options['requests'])
+
+    def report(self, name, path, count):
+        handler = WSGIHandler()
+        environ = RequestFactory().get(path).environ
+        opened_before = connection_stats['opened']
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = handler(dict(environ), lambda *args: None)
+            response.close()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise AssertionError(f'{name}: статус {response.status_code}')
+        latencies.sort()
+        self.stdout.write(
+            f'{name:<15} mean {sum(latencies) / count * 1000:7.2f} мс  '
+            f'p50 {get_percentile(latencies, 50) * 1000:7.2f} мс  '
+            f'p95 {get_percentile(latencies, 95) * 1000:7.2f} мс  '
+            f'новых соединений: {connection_stats["opened"] - opened_before}'
+        )
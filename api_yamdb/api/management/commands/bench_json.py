@@ -0,0 +1,53 @@
+from api.benchmarks import measure_render, seed_catalogue, temporary_database
+from api.renderers import FastJSONRenderer, get_json_backend
+from api.serializers import ReadTitleSerializer, ReviewSerializer
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время рендеринга и пик памяти страниц '
+            'произведений и отзывов стандартным JSONRenderer DRF '
+            'и FastJSONRenderer на временной тестовой базе')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000,
+                            help='Количество объектов на странице')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Количество рендерингов каждой страницы')
+
+    def handle(self, *args, **options):
+        items = options['items']
+        with temporary_database():
+            seed_catalogue(titles=items, reviews=items * 2,
+                           comments=0, users=max(items // 10, 10))
+            pages = {
+                'titles': ReadTitleSerializer(
+                    Title.objects.select_related('category')
+                    .prefetch_related('genres')[:items],
+                    many=True
+                ).data,
+                'reviews': ReviewSerializer(
+                    Review.objects.select_related('author')[:items],
+                    many=True
+                ).data,
+            }
+        renderers = {
+            'drf': JSONRenderer(),
+            f'fast-{get_json_backend()}': FastJSONRenderer(),
+        }
+        for page, data in pages.items():
+            results = {name: measure_render(renderer, data,
+                                            options['repeat'])
+                       for name, renderer in renderers.items()}
+            for name, result in results.items():
+                speedup = results['drf']['best_ms'] / result['best_ms']
+                self.stdout.write(
+                    f'{page:<8} {name:<12} {len(data):>5} объектов  '
+                    f'лучшее {result["best_ms"]:>7.2f} мс  '
+                    f'среднее {result["mean_ms"]:>7.2f} мс  '
+                    f'пик {result["peak_kb"]:>8.1f} КБ  '
+                    f'размер {result["size_kb"]:>7.1f} КБ  '
+                    f'x{speedup:.1f}'
+                )
@@ -0,0 +1,36 @@
+import time
+
+from api.export import EXPORT_CHUNK_SIZE, iter_catalogue
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Выгружает произведения с категорией, жанрами, рейтингом '
+            'и, при необходимости, отзывами в NDJSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', metavar='PATH',
+                            help='Файл для выгрузки, по умолчанию stdout')
+        parser.add_argument('--reviews', action='store_true',
+                            help='Добавить отзывы к каждому произведению')
+        parser.add_argument('--chunk-size', type=int,
+                            default=EXPORT_CHUNK_SIZE,
+                            help='Количество строк в одной пачке чтения')
+
+    def handle(self, *args, **options):
+        chunks = iter_catalogue(include_reviews=options['reviews'],
+                                chunk_size=options['chunk_size'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        started = time.perf_counter()
+        total = 0
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            for chunk in chunks:
+                file.write(chunk)
+                total += chunk.count('\n')
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'titles: {total} строк, {total / max(elapsed, 1e-9):.0f} строк/с'
+        )
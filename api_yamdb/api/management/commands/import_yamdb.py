@@ -0,0 +1,281 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+
+from api.cache import bump_catalogue_version
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+
+IMPORT_ORDER = ('categories', 'genres', 'titles', 'reviews', 'comments')
+
+DEFERRED_INDEX_MODELS = (GenreTitle, Review, Comment)
+
+
+def read_rows(path):
+    """Построчно читает CSV с заголовком или NDJSON (по строке JSON)."""
+    with open(path, encoding='utf-8', newline='') as file:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_genres(value):
+    if isinstance(value, list):
+        return value
+    return [slug.strip() for slug in (value or '').split(',') if slug.strip()]
+
+
+def parse_pub_date(value):
+    if not value:
+        return timezone.now()
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        raise CommandError(f'Неверная дата публикации: {value}')
+    if timezone.is_naive(pub_date):
+        return timezone.make_aware(pub_date)
+    return pub_date
+
+
+@contextmanager
+def auto_now_add_disabled(*models):
+    """Даты публикации берутся из файла, а не ставятся текущими."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+@contextmanager
+def indexes_deferred(enabled):
+    """Снимает составные индексы на время загрузки и строит их
+    заново одним проходом по готовой таблице."""
+    if not enabled:
+        yield
+        return
+    with connection.schema_editor() as schema_editor:
+        for model in DEFERRED_INDEX_MODELS:
+            for index in model._meta.indexes:
+                schema_editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as schema_editor:
+            for model in DEFERRED_INDEX_MODELS:
+                for index in model._meta.indexes:
+                    schema_editor.add_index(model, index)
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает категории, жанры, произведения, отзывы '
+            'и комментарии из CSV или NDJSON пачками через bulk_create')
+
+    def add_arguments(self, parser):
+        for name in IMPORT_ORDER:
+            parser.add_argument(f'--{name}', metavar='PATH',
+                                help=f'Файл .csv или .ndjson ({name})')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Количество строк в одном INSERT')
+        parser.add_argument('--defer-indexes', action='store_true',
+                            help='Снять составные индексы на время загрузки')
+        parser.add_argument('--ignore-conflicts', action='store_true',
+                            help='Пропускать строки, которые уже есть')
+        parser.add_argument('--skip-unknown', action='store_true',
+                            help='Не останавливать загрузку на неизвестных '
+                                 'slug категорий и жанров, а пропускать их '
+                                 'и сообщать количество')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.ignore_conflicts = options['ignore_conflicts']
+        self.skip_unknown = options['skip_unknown']
+        self.unknown = {'categories': 0, 'genres': 0, 'authors': 0}
+        self.categories = {}
+        self.genres = {}
+        with auto_now_add_disabled(Review, Comment):
+            with indexes_deferred(options['defer_indexes']):
+                for name in IMPORT_ORDER:
+                    if options[name]:
+                        getattr(self, f'import_{name}')(options[name])
+        if any(self.unknown.values()):
+            self.stdout.write(self.style.WARNING(
+                'Пропущено неизвестных: категорий '
+                f'{self.unknown["categories"]}, жанров '
+                f'{self.unknown["genres"]}, авторов '
+                f'{self.unknown["authors"]}'
+            ))
+        self.reset_sequences()
+        call_command('reconcile_counters', stdout=self.stdout)
+        bump_catalogue_version()
+
+    def insert(self, name, model, path, build_batch):
+        started = time.perf_counter()
+        total = 0
+        for rows in batched(read_rows(path), self.batch_size):
+            objects, links = build_batch(rows)
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    objects, ignore_conflicts=self.ignore_conflicts
+                )
+                if links:
+                    GenreTitle.objects.bulk_create(
+                        links, ignore_conflicts=self.ignore_conflicts
+                    )
+            total += len(rows)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{name}: {total} строк, {total / elapsed:.0f} строк/с'
+            )
+
+    def import_categories(self, path):
+        self.insert('categories', Category, path, lambda rows: ([
+            Category(name=row['name'], slug=row['slug']) for row in rows
+        ], None))
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+
+    def import_genres(self, path):
+        self.insert('genres', Genre, path, lambda rows: ([
+            Genre(name=row['name'], slug=row['slug']) for row in rows
+        ], None))
+        self.genres = dict(Genre.objects.values_list('slug', 'id'))
+
+    def import_titles(self, path):
+        if not self.categories:
+            self.categories = dict(
+                Category.objects.values_list('slug', 'id')
+            )
+        if not self.genres:
+            self.genres = dict(Genre.objects.values_list('slug', 'id'))
+        self.insert('titles', Title, path, self.build_titles)
+
+    def build_titles(self, rows):
+        titles = []
+        links = []
+        for row in rows:
+            title_id = int(row['id'])
+            titles.append(Title(
+                id=title_id,
+                name=row['name'],
+                year=int(row['year']),
+                description=row.get('description') or None,
+                category_id=self.get_category_id(title_id,
+                                                 row.get('category')),
+            ))
+            links.extend(
+                GenreTitle(title_id_id=title_id, genre_id_id=genre_id)
+                for genre_id in self.get_genre_ids(title_id,
+                                                   row.get('genre'))
+            )
+        return titles, links
+
+    def get_category_id(self, title_id, slug):
+        if not slug:
+            return None
+        if slug not in self.categories:
+            self.report_unknown('categories', f'Произведение {title_id}',
+                                slug)
+        return self.categories.get(slug)
+
+    def get_genre_ids(self, title_id, value):
+        genre_ids = []
+        for slug in parse_genres(value):
+            if slug in self.genres:
+                genre_ids.append(self.genres[slug])
+            else:
+                self.report_unknown('genres', f'Произведение {title_id}',
+                                    slug)
+        return genre_ids
+
+    def report_unknown(self, name, owner, value):
+        """Без --skip-unknown неизвестный slug или username
+        останавливает загрузку: молча потерянные связи потом
+        не найти."""
+        if not self.skip_unknown:
+            raise CommandError(
+                f'{owner}: неизвестное значение «{value}» ({name}). '
+                'Загрузите их раньше или передайте --skip-unknown'
+            )
+        self.unknown[name] += 1
+
+    def get_authors(self, rows):
+        usernames = {row['author'] for row in rows if row.get('author')}
+        return dict(User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'id'))
+
+    def get_author_id(self, authors, owner, username):
+        if not username:
+            return None
+        if username not in authors:
+            self.report_unknown('authors', owner, username)
+        return authors.get(username)
+
+    def import_reviews(self, path):
+        self.insert('reviews', Review, path, self.build_reviews)
+
+    def build_reviews(self, rows):
+        authors = self.get_authors(rows)
+        return [
+            Review(
+                id=int(row['id']),
+                title_id=int(row['title_id']),
+                author_id=self.get_author_id(authors, f'Отзыв {row["id"]}',
+                                             row.get('author')),
+                text=row['text'],
+                score=int(row['score']),
+                pub_date=parse_pub_date(row.get('pub_date')),
+            )
+            for row in rows
+        ], None
+
+    def import_comments(self, path):
+        self.insert('comments', Comment, path, self.build_comments)
+
+    def build_comments(self, rows):
+        authors = self.get_authors(rows)
+        return [
+            Comment(
+                id=int(row['id']) if row.get('id') else None,
+                review_id_id=int(row['review_id']),
+                author_id=self.get_author_id(
+                    authors, f'Комментарий {row.get("id", "")}',
+                    row.get('author')
+                ),
+                text=row['text'],
+                pub_date=parse_pub_date(row.get('pub_date')),
+            )
+            for row in rows
+        ], None
+
+    def reset_sequences(self):
+        """После вставки с явными id счётчики PostgreSQL отстают."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [Category, Genre, Title, GenreTitle, Review, Comment]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.models import EmailAndCode
+
+
+class Command(BaseCommand):
+    help = ('Удаляет просроченные коды подтверждения небольшими пачками, '
+            'чтобы не держать долгих блокировок')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Количество строк в одном DELETE')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Пауза между пачками, секунд')
+
+    def handle(self, *args, **options):
+        purged = 0
+        while True:
+            ids = list(
+                EmailAndCode.objects.expired().order_by(
+                    'expire_date'
+                ).values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            purged += EmailAndCode.objects.filter(id__in=ids).delete()[0]
+            time.sleep(options['pause'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено просроченных кодов: {purged}')
+        )
@@ -0,0 +1,51 @@
+import time
+
+from api.outbox import send_pending_emails
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из outbox пачками через одно соединение'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Количество писем в одной пачке')
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help='После стольких неудач письмо '
+                                 'больше не отправляется')
+        parser.add_argument('--retry-delay', type=int, default=30,
+                            help='Задержка перед первой повторной '
+                                 'попыткой, секунд; дальше удваивается')
+        parser.add_argument('--lease', type=int, default=300,
+                            help='На сколько секунд пачка закрепляется '
+                                 'за воркером; должно хватать на её '
+                                 'отправку')
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, опрашивая outbox')
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Пауза между опросами пустого outbox '
+                                 'в режиме --loop, секунд')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_pending_emails(
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                    retry_delay=options['retry_delay'],
+                    lease=options['lease']
+                )
+            except Exception as error:
+                # Например, база недоступна: воркер ждёт и пробует
+                # снова, а не падает.
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Ошибка отправки: {error!r}')
+                time.sleep(options['sleep'])
+                continue
+            if sent or failed:
+                self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+            if not options['loop']:
+                return
+            if sent + failed < options['batch_size']:
+                time.sleep(options['sleep'])
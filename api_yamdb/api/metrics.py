@@ -0,0 +1,316 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+HEADER = struct.Struct('i')
+KEY_LENGTH = struct.Struct('i')
+VALUE = struct.Struct('d')
+INITIAL_FILE_SIZE = 1 << 16
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class MmapedValues:
+    """
+    Словарь ключ → float в mmap-файле, в который пишет только один
+    процесс. Записи только добавляются: длина ключа, ключ, выравнивание
+    до 8 байт и значение. Первые 8 байт хранят занятый размер, он
+    обновляется последним, поэтому читатели видят только целые записи.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(INITIAL_FILE_SIZE)
+        self._map()
+        self._positions = {
+            key: position for key, position, _ in read_entries(self._mmap)
+        }
+
+    def _map(self):
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = HEADER.unpack_from(self._mmap, 0)[0] or 8
+
+    def _add(self, key):
+        encoded = key.encode()
+        padding = 8 - (KEY_LENGTH.size + len(encoded)) % 8
+        size = KEY_LENGTH.size + len(encoded) + padding + VALUE.size
+        while self._used + size > self._capacity:
+            self._mmap.close()
+            self._file.truncate(self._capacity * 2)
+            self._map()
+        position = self._used
+        KEY_LENGTH.pack_into(self._mmap, position, len(encoded))
+        self._mmap[position + KEY_LENGTH.size:
+                   position + KEY_LENGTH.size + len(encoded)] = encoded
+        value_position = position + size - VALUE.size
+        VALUE.pack_into(self._mmap, value_position, 0.0)
+        self._used += size
+        HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = value_position
+        return value_position
+
+    def inc(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._add(key)
+        value = VALUE.unpack_from(self._mmap, position)[0]
+        VALUE.pack_into(self._mmap, position, value + amount)
+
+
+def read_entries(data):
+    used = HEADER.unpack_from(data, 0)[0]
+    position = 8
+    while position < used:
+        length = KEY_LENGTH.unpack_from(data, position)[0]
+        key_start = position + KEY_LENGTH.size
+        key = bytes(data[key_start:key_start + length]).decode()
+        padding = 8 - (KEY_LENGTH.size + length) % 8
+        value_position = key_start + length + padding
+        yield key, value_position, VALUE.unpack_from(data, value_position)[0]
+        position = value_position + VALUE.size
+
+
+class MetricsStore:
+    """
+    Счётчики метрик. Без METRICS_DIR живут в памяти процесса,
+    с METRICS_DIR каждый воркер пишет в свой mmap-файл, а /metrics
+    любого воркера суммирует файлы всех процессов.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._values = None
+        self._archive = None
+
+    def _get_values(self):
+        # После fork у воркера gunicorn свой pid и свой файл.
+        if self._pid == os.getpid():
+            return self._values
+        self._pid = os.getpid()
+        if not self.directory:
+            self._values = defaultdict(float)
+            return self._values
+        os.makedirs(self.directory, exist_ok=True)
+        self._values = MmapedValues(
+            os.path.join(self.directory, f'metrics_{self._pid}.db')
+        )
+        return self._values
+
+    def inc(self, key, amount=1):
+        with self._lock:
+            values = self._get_values()
+            if isinstance(values, MmapedValues):
+                values.inc(key, amount)
+            else:
+                values[key] += amount
+
+    def merge(self, pid):
+        """
+        Переносит значения завершившегося процесса в файл архива.
+        Вызывается только в мастере gunicorn, поэтому у архива
+        один писатель, как у файлов воркеров.
+        """
+        path = os.path.join(self.directory, f'metrics_{pid}.db')
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return
+        os.remove(path)
+        if len(data) < 8:
+            return
+        with self._lock:
+            if self._archive is None:
+                self._archive = MmapedValues(
+                    os.path.join(self.directory, 'metrics_archive.db')
+                )
+            for key, _, value in read_entries(data):
+                self._archive.inc(key, value)
+
+    def collect(self):
+        if not self.directory:
+            with self._lock:
+                return dict(self._get_values())
+        totals = defaultdict(float)
+        for path in glob.glob(os.path.join(self.directory, 'metrics_*.db')):
+            with open(path, 'rb') as file:
+                data = file.read()
+            if len(data) < 8:
+                continue
+            for key, _, value in read_entries(data):
+                totals[key] += value
+        return totals
+
+
+store = MetricsStore(settings.METRICS_DIR)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace(
+        '"', '\\"'
+    ).replace('\n', '\\n')
+
+
+def merge_worker_metrics(pid):
+    store.merge(pid)
+
+
+def format_labels(labels):
+    return ','.join(f'{name}="{escape_label(value)}"'
+                    for name, value in labels)
+
+
+@lru_cache(maxsize=4096)
+def make_key(name, labels):
+    """Ключ хранилища: имя серии и пары меток в JSON. Метки
+    ограничены именами обработчиков, поэтому кэш не разрастается."""
+    return json.dumps([name, [list(label) for label in labels]],
+                      ensure_ascii=False)
+
+
+def get_sort_key(name, labels):
+    bucket = dict(labels).get('le')
+    return (name, [label for label in labels if label[0] != 'le'],
+            float(bucket) if bucket else 0)
+
+
+class Metric:
+    metric_type = None
+    suffixes = ('',)
+
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def get_key(self, suffix, labels, extra=()):
+        return make_key(self.name + suffix,
+                        tuple(zip(self.label_names, map(str, labels)))
+                        + tuple(extra))
+
+    def render(self, values):
+        series = []
+        names = {self.name + suffix for suffix in self.suffixes}
+        for key, value in values.items():
+            name, labels = json.loads(key)
+            if name in names:
+                series.append((get_sort_key(name, labels), name, labels,
+                               value))
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} {self.metric_type}']
+        for _, name, labels, value in sorted(series):
+            lines.append(f'{name}{{{format_labels(labels)}}} {value:g}')
+        return lines
+
+
+class Counter(Metric):
+    metric_type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        store.inc(self.get_key('', labels), amount)
+
+
+class Histogram(Metric):
+    metric_type = 'histogram'
+    suffixes = ('_bucket', '_sum', '_count')
+
+    def __init__(self, name, documentation, label_names, buckets):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+
+    def observe(self, value, *labels):
+        # Корзины хранятся уже накопленными, как их и отдаёт Prometheus.
+        for bucket in self.buckets:
+            if value <= bucket:
+                store.inc(self.get_key('_bucket', labels,
+                                       (('le', f'{bucket:g}'),)))
+        store.inc(self.get_key('_bucket', labels, (('le', '+Inf'),)))
+        store.inc(self.get_key('_sum', labels), value)
+        store.inc(self.get_key('_count', labels))
+
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total',
+    'Запросы к API по обработчику, методу и статусу ответа',
+    ('view', 'method', 'status')
+)
+REQUEST_DURATION = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки запроса',
+    ('view',),
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUEST_QUERIES = Histogram(
+    'yamdb_db_queries_per_request',
+    'Количество SQL-запросов на запрос к API',
+    ('view',),
+    (0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+CACHE_REQUESTS = Counter(
+    'yamdb_cache_requests_total',
+    'Обращения к кэшам приложения: hit или miss',
+    ('cache', 'result')
+)
+METRICS = (REQUESTS, REQUEST_DURATION, REQUEST_QUERIES, CACHE_REQUESTS)
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache, 'hit' if hit else 'miss')
+
+
+def render_hit_ratios(values):
+    requests = defaultdict(lambda: {'hit': 0, 'miss': 0})
+    for key, value in values.items():
+        name, labels = json.loads(key)
+        if name == CACHE_REQUESTS.name:
+            labels = dict(labels)
+            requests[labels['cache']][labels['result']] += value
+    lines = ['# HELP yamdb_cache_hit_ratio Доля попаданий в кэш',
+             '# TYPE yamdb_cache_hit_ratio gauge']
+    for cache, counts in sorted(requests.items()):
+        total = counts['hit'] + counts['miss']
+        lines.append(f'yamdb_cache_hit_ratio{{cache="{cache}"}} '
+                     f'{counts["hit"] / total if total else 0:g}')
+    return lines
+
+
+class MetricsMiddleware:
+    """Считает запросы по имени обработчика из RequestTimingMiddleware,
+    поэтому подключается перед ним."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        stats = getattr(request, 'timing_stats', None)
+        if stats is None or request.path == '/metrics':
+            return response
+        view = stats.view_name or 'unmatched'
+        method = request.method if request.method in METHODS else 'other'
+        REQUESTS.inc(view, method, response.status_code)
+        REQUEST_DURATION.observe(stats.timings['total'] / 1000, view)
+        REQUEST_QUERIES.observe(stats.queries, view)
+        return response
+
+
+def metrics_view(request):
+    values = store.collect()
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render(values))
+    lines.extend(render_hit_ratios(values))
+    return HttpResponse('\n'.join(lines) + '\n', content_type=CONTENT_TYPE)
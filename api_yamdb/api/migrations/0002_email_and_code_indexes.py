@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailandcode',
+            name='expire_date',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='emailandcode',
+            name='username',
+            field=models.CharField(db_index=True, max_length=25),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailandcode',
+            name='confirm_code',
+            field=models.CharField(max_length=64),
+        ),
+    ]
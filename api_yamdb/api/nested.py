@@ -0,0 +1,34 @@
+from rest_framework.generics import get_object_or_404
+
+
+class NestedResourceMixin:
+    """
+    Вьюсет вложенного ресурса вида /titles/{title_id}/reviews/.
+    Вся цепочка родителей проверяется одним запросом: parent_lookups
+    сопоставляет поля родительской модели с параметрами URL, например
+    отзыв ищется сразу по своему id и id произведения. Найденный
+    родитель запоминается до конца запроса, а дочерние объекты
+    фильтруются и создаются по значению parent_field без загрузки
+    связанных объектов.
+    """
+    parent_model = None
+    parent_lookups = {}
+    parent_field = None
+
+    def get_parent(self):
+        if getattr(self, '_parent', None) is None:
+            self._parent = get_object_or_404(
+                self.parent_model.objects.only('pk'),
+                **{field: self.kwargs[kwarg]
+                   for field, kwarg in self.parent_lookups.items()}
+            )
+        return self._parent
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            **{self.parent_field: self.get_parent().pk}
+        )
+
+    def get_parent_values(self):
+        """Поле родителя для сохранения дочернего объекта."""
+        return {self.parent_field: self.get_parent().pk}
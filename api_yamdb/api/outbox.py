@@ -0,0 +1,92 @@
+import datetime as dt
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from reviews.models import OutgoingEmail
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """
+    Аналог send_mail: вместо SMTP-запроса пишет письма в outbox.
+    Вызывается внутри транзакции запроса, поэтому письмо уйдёт
+    только если данные регистрации сохранились.
+    """
+    return OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(subject=subject, body=message,
+                      from_email=from_email or '', to=recipient)
+        for recipient in recipient_list
+    )
+
+
+def claim_emails(batch_size, max_attempts, lease):
+    """
+    Короткой транзакцией забирает пачку писем и сдвигает их send_after
+    на lease секунд вперёд. Другие воркеры эти письма пропускают,
+    а если воркер упадёт, не отправив их, они снова станут доступны
+    после истечения аренды.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                send_after__lte=now,
+                attempts__lt=max_attempts
+            ).order_by('send_after', 'id')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            id__in=[email.id for email in emails]
+        ).update(send_after=now + dt.timedelta(seconds=lease))
+    return emails
+
+
+def schedule_retry(email, error, retry_delay):
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.send_after = timezone.now() + dt.timedelta(
+        seconds=retry_delay * 2 ** (email.attempts - 1)
+    )
+
+
+def send_pending_emails(batch_size=100, max_attempts=5, retry_delay=30,
+                        lease=300):
+    """
+    Отправляет одну пачку писем из outbox через одно соединение
+    с почтовым сервером, вне транзакции базы. Отправленные письма
+    удаляются, неудачным увеличивается счётчик попыток
+    и откладывается следующая попытка с экспоненциальной задержкой.
+    Если сервер недоступен, откладывается вся пачка.
+    Возвращает (отправлено, ошибок).
+    """
+    emails = claim_emails(batch_size, max_attempts, lease)
+    if not emails:
+        return 0, 0
+    failed = []
+    sent_ids = []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            schedule_retry(email, error, retry_delay)
+        failed = emails
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(email.subject, email.body,
+                                       email.from_email or None, [email.to],
+                                       connection=connection)
+                try:
+                    message.send()
+                except Exception as error:
+                    schedule_retry(email, error, retry_delay)
+                    failed.append(email)
+                else:
+                    sent_ids.append(email.id)
+        finally:
+            connection.close()
+    OutgoingEmail.objects.bulk_update(
+        failed, ['attempts', 'last_error', 'send_after']
+    )
+    sent = OutgoingEmail.objects.filter(id__in=sent_ids).delete()[0]
+    return sent, len(failed)
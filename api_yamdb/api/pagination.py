@@ -0,0 +1,161 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+UNIQUE_FIELDS = ('id', 'pk')
+
+
+def reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}'
+                 for field in ordering)
+
+
+def keyset_after(ordering, position):
+    """
+    Условие «строка идёт после position» при сортировке ordering:
+    (a, b) > (x, y) раскрывается в a > x OR (a = x AND b > y)
+    с учётом направления каждого поля.
+    """
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return condition
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по ключу: курсор хранит значения всех полей
+    сортировки крайней записи страницы, и соседняя страница
+    выбирается условием по ним, без OFFSET и без подсчёта COUNT(*).
+    Сортировка всегда заканчивается на id, поэтому записи с равными
+    значениями не повторяются и не теряются.
+    """
+    page_size_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        reverse, self.position = self.decode_cursor(request) or (False,
+                                                                 None)
+        ordering = (reverse_ordering(self.ordering) if reverse
+                    else self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(keyset_after(ordering,
+                                                        self.position))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Пустая страница при движении назад: впереди всё с начала.
+        position = (self.get_position(self.page[-1]) if self.page
+                    else None)
+        return self.encode_cursor((False, position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = (self.get_position(self.page[0]) if self.page
+                    else self.position)
+        return self.encode_cursor((True, position))
+
+    def get_position(self, instance):
+        return [str(getattr(instance, field.lstrip('-')))
+                for field in self.ordering]
+
+    def encode_cursor(self, cursor):
+        encoded = urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param,
+                                   encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            reverse, position = json.loads(
+                urlsafe_b64decode(encoded.encode('ascii'))
+            )
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if position is not None and (
+                not isinstance(position, list)
+                or len(position) != len(self.ordering)
+                or not all(isinstance(value, str) for value in position)):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), position
+
+    def get_ordering(self, request, queryset, view):
+        # Без ?ordering= фильтр сортировки ничего не возвращает,
+        # тогда страницы идут по view.cursor_ordering.
+        ordering = tuple(self.ordering)
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = tuple(
+                    backend().get_ordering(request, queryset, view)
+                    or ordering
+                )
+                break
+        if ordering[-1].lstrip('-') not in UNIQUE_FIELDS:
+            ordering += ('id',)
+        return ordering
+
+
+class CursorOrLimitOffsetPagination(LimitOffsetPagination):
+    """
+    По умолчанию работает как LimitOffsetPagination. Если в запросе
+    передан параметр ?cursor (в том числе пустой для первой страницы),
+    переключается на KeysetPagination с сортировкой из
+    view.cursor_ordering.
+    """
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            self.keyset.cursor_query_param = self.cursor_query_param
+            self.keyset.ordering = getattr(
+                view, 'cursor_ordering', self.cursor_ordering
+            )
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
@@ -0,0 +1,69 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Типы, которых orjson не знает (Decimal, ленивые строки перевода,
+# QuerySet), кодируются так же, как в DRF.
+encoder = JSONEncoder()
+
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+                  if orjson is not None else 0)
+
+# Как и DRF, экранируются разделители строк, недопустимые в JS.
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'),
+                   (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def get_json_backend():
+    """orjson, если он выбран в JSON_BACKEND и установлен, иначе json."""
+    if settings.JSON_BACKEND == 'orjson' and orjson is not None:
+        return 'orjson'
+    return 'json'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Вывод совпадает с компактным выводом DRF;
+    запросы с отступами, например из браузерного API, рендерит
+    стандартный json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type or '',
+                                 renderer_context or {})
+        if get_json_backend() != 'orjson' or indent:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        content = orjson.dumps(data, default=encoder.default,
+                               option=ORJSON_OPTIONS)
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if get_json_backend() != 'orjson':
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET
+        )
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, UnicodeDecodeError) as error:
+            raise ParseError(f'JSON parse error - {error}')
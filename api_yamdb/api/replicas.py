@@ -0,0 +1,109 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+# Выбор базы действует в пределах запроса, а запросы gthread-воркера
+# идут в разных потоках, как и соединения Django.
+state = threading.local()
+
+
+def get_pin_key(user_id):
+    return f'api:replica:pin:{user_id}'
+
+
+def get_pin_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def use_replica():
+    if settings.DATABASE_REPLICAS:
+        state.replica = random.choice(settings.DATABASE_REPLICAS)
+
+
+def pin_primary():
+    """Оставшиеся чтения запроса пойдут в основную базу."""
+    state.primary_only = True
+
+
+def wrote_to_primary():
+    return getattr(state, 'wrote', False)
+
+
+def reset():
+    state.replica = None
+    state.primary_only = False
+    state.wrote = False
+
+
+def replica_may_lag(changed_at):
+    """Изменение моложе DB_REPLICA_LAG секунд могло ещё не дойти
+    до реплики."""
+    return time.time() - changed_at < settings.DB_REPLICA_LAG
+
+
+class ReplicaRouter:
+    """
+    Чтения запроса, для которого вызван use_replica, идут в одну
+    из реплик DATABASE_REPLICAS. После первой записи в этом запросе
+    и после pin_primary чтения возвращаются в основную базу, чтобы
+    запрос видел свои изменения. Все записи идут в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(state, 'replica', None)
+        if (replica and not getattr(state, 'primary_only', False)
+                and not wrote_to_primary()):
+            return replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему на реплики переносит репликация.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Безопасные запросы к вьюсету читают из реплики. Пользователь,
+    который недавно что-то записал, DB_REPLICA_LAG секунд читает
+    из основной базы и видит свои изменения.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        reset()
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if wrote_to_primary() and settings.DATABASE_REPLICAS:
+                self.pin_author()
+            reset()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.DATABASE_REPLICAS:
+            return
+        if request.method not in SAFE_METHODS:
+            return
+        user = request.user
+        if (user.is_authenticated
+                and get_pin_cache().get(get_pin_key(user.pk))):
+            return
+        use_replica()
+
+    def pin_author(self):
+        user = getattr(self.request, 'user', None)
+        if user is not None and user.is_authenticated:
+            get_pin_cache().set(get_pin_key(user.pk), True,
+                                settings.DB_REPLICA_LAG)
@@ -1,16 +1,24 @@
 import datetime as dt
 
-from django.core.exceptions import ObjectDoesNotExist
+from django.conf import settings
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import transaction
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from rest_framework import serializers
-from rest_framework.exceptions import NotFound
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueValidator
 from reviews.models import (Category, Comment, EmailAndCode, Genre, Review,
                             Title, User)
+from reviews.validators import validate_year
 
+from .fieldsets import SparseFieldsMixin
+from .outbox import queue_mail
 
-class UserSerializer(serializers.ModelSerializer):
+CONFIRM_CODE_LIFETIME_MINUTES = 5
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     username = serializers.CharField(required=True)
     email = serializers.EmailField(required=True)
@@ -33,70 +41,70 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
 
-class GetTokenSerializer(serializers.ModelSerializer):
+class GetTokenSerializer(serializers.Serializer):
 
     username = serializers.CharField(required=True)
     confirmation_code = serializers.CharField(required=True)
-    expire_date = serializers.DateTimeField(required=False)
-
-    def validate(self, validated_data):
-        username = validated_data['username']
-        confirm_code = validated_data['confirmation_code']
-        if not EmailAndCode.objects.filter(
-                username=username, confirm_code=confirm_code).exists():
-            raise serializers.ValidationError('Неверный код подтверждения')
-        return validated_data
-
-    def validate_username(self, value):
-        if not User.objects.filter(username=value).exists():
-            raise NotFound
-        return value
-
-    class Meta:
-        model = EmailAndCode
-        fields = ['username', 'confirmation_code', 'expire_date']
 
 
-class ConfirmEmailSerializer(serializers.ModelSerializer):
+class ConfirmEmailSerializer(serializers.Serializer):
+    """
+    Регистрация без предварительных SELECT: уникальность логина и почты
+    проверяет база, а IntegrityError превращается в ошибку валидации.
+    """
 
     username = serializers.CharField(required=True)
     email = serializers.EmailField(required=True)
-    confirm_code = serializers.CharField(required=False)
-    expire_date = serializers.DateTimeField(required=False)
 
     def create(self, validated_data):
-        email = validated_data.get('email')
         try:
-            instance = EmailAndCode.objects.get(email=email)
-            return self.update(instance, validated_data)
-        except ObjectDoesNotExist:
-            return EmailAndCode.objects.create(**validated_data)
-
-    def update(self, instance, validated_data):
-        instance.confirm_code = validated_data.get(
-            'confirm_code')
-        instance.expire_date = validated_data.get(
-            'expire_date')
-        instance.save()
-        return instance
+            return self.register(**validated_data)
+        except IntegrityError:
+            self.raise_taken(**validated_data)
+        # Пользователя с такой почтой уже нет, а код подтверждения
+        # остался от удалённой учётной записи.
+        EmailAndCode.objects.filter(email=validated_data['email']).delete()
+        return self.register(**validated_data)
+
+    @staticmethod
+    def register(username, email):
+        with transaction.atomic():
+            user = User.objects.create_user(username=username,
+                                            email=email)
+            conf_code = PasswordResetTokenGenerator().make_token(user=user)
+            EmailAndCode.objects.create(
+                username=username,
+                email=email,
+                confirm_code=conf_code,
+                expire_date=timezone.now() + dt.timedelta(
+                    minutes=CONFIRM_CODE_LIFETIME_MINUTES
+                )
+            )
+            queue_mail(
+                'Email confirmation',
+                f'Your confirmation code: {conf_code}',
+                settings.DEFAULT_FROM_EMAIL,
+                [email, ],
+            )
+        return user
+
+    @staticmethod
+    def raise_taken(username, email):
+        errors = {}
+        if User.objects.filter(username=username).exists():
+            errors['username'] = ['Данный никнейм уже зарегистрирован']
+        if User.objects.filter(email=email).exists():
+            errors['email'] = ['Данный электронный адрес'
+                               ' уже зарегистрирован']
+        if errors:
+            raise serializers.ValidationError(errors)
 
     def validate_username(self, value):
-        if value == 'me' or User.objects.filter(username=value).exists():
+        if value == 'me':
             raise serializers.ValidationError('Данный никнейм'
                                               ' уже зарегистрирован')
         return value
 
-    def validate_email(self, value):
-        if (EmailAndCode.objects.filter(email=value).exists()
-                or User.objects.filter(email=value).exists()):
-            raise serializers.ValidationError('Данный электронный адрес'
-                                              ' уже зарегистрирован')
-        return value
-
-    class Meta:
-        model = EmailAndCode
-        fields = ['username', 'email', 'confirm_code', 'expire_date']
-
 
 class CategorySerializer(serializers.ModelSerializer):
 
@@ -119,7 +127,7 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class ReadTitleSerializer(serializers.ModelSerializer):
+class ReadTitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     category = CategorySerializer()
     genre = GenreSerializer(many=True, source='genres')
@@ -127,9 +135,10 @@ class ReadTitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
+        fields = ('id', 'name', 'year', 'rating', 'reviews_count',
                   'description', 'genre', 'category')
-        read_only_fields = ('category', 'genres')
+        read_only_fields = ('category', 'genres', 'reviews_count')
+        field_columns = {'rating': ('score_sum', 'reviews_count')}
 
 
 class WriteTitleSerializer(serializers.ModelSerializer):
@@ -160,7 +169,34 @@ class WriteTitleSerializer(serializers.ModelSerializer):
         return value
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class BulkSlugSerializer(serializers.Serializer):
+    """
+    Элемент пакетной записи жанров и категорий. Проверяет только
+    формат: уникальность slug для всей пачки проверяет api.bulk
+    одним запросом.
+    """
+
+    name = serializers.CharField(max_length=255)
+    slug = serializers.SlugField(max_length=50)
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    """
+    Элемент пакетной записи произведений. Категория и жанры
+    передаются slug'ами и разрешаются в api.bulk сразу для всей пачки.
+    """
+
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=255)
+    year = serializers.IntegerField(validators=[validate_year])
+    description = serializers.CharField(required=False, allow_blank=True,
+                                        allow_null=True)
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField(),
+                                  allow_empty=False)
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     author = serializers.SlugRelatedField(
         slug_field='username',
@@ -170,7 +206,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comments_count')
+        read_only_fields = ('comments_count',)
 
     def create(self, validated_data):
         try:
@@ -180,7 +218,7 @@ class ReviewSerializer(serializers.ModelSerializer):
                                               ' одного отзыва на произведение')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     author = serializers.SlugRelatedField(
         slug_field='username',
@@ -0,0 +1,26 @@
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.models import Category, Genre, GenreTitle, Review, Title, User
+
+from .authentication import invalidate_cached_user
+from .cache import invalidate_catalogue
+from .health import check_connections, count_new_connection
+
+for model in (Category, Genre, GenreTitle, Review, Title):
+    post_save.connect(invalidate_catalogue, sender=model,
+                      dispatch_uid=f'invalidate_catalogue_save_{model}')
+    post_delete.connect(invalidate_catalogue, sender=model,
+                        dispatch_uid=f'invalidate_catalogue_delete_{model}')
+
+m2m_changed.connect(invalidate_catalogue, sender=Title.genres.through,
+                    dispatch_uid='invalidate_catalogue_genres')
+
+post_save.connect(invalidate_cached_user, sender=User,
+                  dispatch_uid='invalidate_cached_user_save')
+post_delete.connect(invalidate_cached_user, sender=User,
+                    dispatch_uid='invalidate_cached_user_delete')
+
+request_started.connect(check_connections, dispatch_uid='check_connections')
+connection_created.connect(count_new_connection,
+                           dispatch_uid='count_new_connection')
@@ -0,0 +1,54 @@
+import mimetypes
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import (STATIC_LEVELS, STATIC_SUFFIXES, compress,
+                          get_encodings, is_compressible)
+
+
+def guess_content_type(name):
+    if name.endswith(('.yaml', '.yml')):
+        return 'application/yaml'
+    return mimetypes.guess_type(name)[0] or ''
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    collectstatic кладёт рядом с каждым файлом копию с хэшем
+    содержимого в имени, а рядом с текстовыми файлами ещё .gz и .br,
+    которые nginx отдаёт через gzip_static без сжатия на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_files = super().post_process(paths, dry_run, **options)
+        for name, hashed_name, processed in processed_files:
+            if not dry_run and not isinstance(processed, Exception):
+                self.compress_file(name)
+                self.compress_file(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress_file(self, name):
+        if not name or not is_compressible(guess_content_type(name)):
+            return
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < settings.COMPRESSION_MIN_SIZE:
+            return
+        for encoding in get_encodings():
+            compressed = compress(data, encoding, STATIC_LEVELS[encoding])
+            if len(compressed) >= len(data):
+                continue
+            path = name + STATIC_SUFFIXES[encoding]
+            if self.exists(path):
+                self.delete(path)
+            self._save(path, ContentFile(compressed))
+
+    def stored_name(self, name):
+        # До первого collectstatic, например при разработке и в тестах,
+        # файлы отдаются по исходным именам.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
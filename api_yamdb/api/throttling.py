@@ -0,0 +1,167 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connections
+from django.http import JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+try:
+    from .db_pool.base import PoolTimeout
+except (ImportError, ImproperlyConfigured):
+    PoolTimeout = None
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+SHED_EXEMPT_PATHS = ('/health/', '/metrics')
+
+
+def parse_rate(rate):
+    """'10/min' → (10, 60), в том же формате, что и у DRF."""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period[0]]
+
+
+def throttle_scope(scope):
+    """Задаёт throttle_scope функции-обработчику с @api_view,
+    ставится над этим декоратором."""
+    def decorator(view):
+        view.cls.throttle_scope = scope
+        return view
+    return decorator
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ведро на rate токенов из REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    по ключу '<throttle_scope>.<kind>', которое за период наполняется
+    заново. Хранится одно число (GCRA): момент, когда ведро снова
+    будет полным. Оно лежит в общем кэше, поэтому лимит действует
+    для всех воркеров. Вьюсет ограничивает только действия из
+    throttle_actions, если они заданы.
+    """
+    kind = None
+    timer = time.time
+
+    def get_identity(self, request):
+        raise NotImplementedError
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        actions = getattr(view, 'throttle_actions', None)
+        action = getattr(view, 'action', None)
+        if scope is None or (actions is not None and action not in actions):
+            return None
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        return rates.get(f'{scope}.{self.kind}')
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        rate = self.get_rate(view)
+        identity = self.get_identity(request) if rate else None
+        if identity is None:
+            return True
+        count, period = parse_rate(rate)
+        key = f'api:throttle:{view.throttle_scope}:{self.kind}:{identity}'
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        now = self.timer()
+        # Между чтением и записью другой воркер может пропустить ещё
+        # запрос того же клиента: лимит приблизительный, зато без
+        # блокировок в кэше.
+        full_at = max(cache.get(key) or now, now) + period / count
+        if full_at - now > period:
+            self.retry_after = full_at - period - now
+            return False
+        cache.set(key, full_at, math.ceil(full_at - now))
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    kind = 'ip'
+
+    def get_identity(self, request):
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    kind = 'user'
+
+    def get_identity(self, request):
+        if not request.user.is_authenticated:
+            return None
+        return request.user.pk
+
+
+def get_queue_time(request):
+    """
+    Сколько секунд запрос ждал воркера после nginx, по заголовку
+    X-Request-Start: t=<время в секундах>. Другие прокси передают
+    время в миллисекундах или микросекундах.
+    """
+    header = request.META.get('HTTP_X_REQUEST_START', '')
+    try:
+        started = float(header.replace('t=', '', 1))
+    except ValueError:
+        return None
+    while started > 1e11:
+        started /= 1000
+    return time.time() - started
+
+
+def pool_is_exhausted():
+    for connection in connections.all():
+        get_pool_stats = getattr(connection, 'get_pool_stats', None)
+        stats = get_pool_stats() if get_pool_stats else None
+        if stats and stats['in_use'] >= (stats['size']
+                                         * settings.LOAD_SHED_POOL_RATIO):
+            return True
+    return False
+
+
+class LoadSheddingMiddleware:
+    """
+    Отвечает 503 с Retry-After, не доходя до базы, если запрос
+    простоял в очереди дольше LOAD_SHED_QUEUE_MS или пул соединений
+    процесса занят на LOAD_SHED_POOL_RATIO. Клиенту лучше быстро
+    повторить запрос, чем ждать, пока воркер до него доберётся.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (not request.path.startswith(SHED_EXEMPT_PATHS)
+                and self.is_overloaded(request)):
+            return self.overloaded_response()
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        # Проверка пула до запроса не исключает гонку потоков: если
+        # соединение так и не освободилось, ответ тоже 503, а не 500.
+        if (PoolTimeout is not None
+                and isinstance(exception, OperationalError)
+                and isinstance(exception.__cause__, PoolTimeout)):
+            return self.overloaded_response()
+        return None
+
+    @staticmethod
+    def overloaded_response():
+        response = JsonResponse(
+            {'detail': 'Сервер перегружен, повторите запрос позже'},
+            status=503, json_dumps_params={'ensure_ascii': False}
+        )
+        response['Retry-After'] = str(settings.LOAD_SHED_RETRY_AFTER)
+        return response
+
+    @staticmethod
+    def is_overloaded(request):
+        queue_time = get_queue_time(request)
+        if (queue_time is not None and settings.LOAD_SHED_QUEUE_MS
+                and queue_time * 1000 > settings.LOAD_SHED_QUEUE_MS):
+            return True
+        return pool_is_exhausted()
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
                     ReviewViewSet, TitleViewSet, UserViewSet, confirm_email,
-                    get_token)
+                    export_titles, get_slow_requests, get_token)
 
 router_v1 = DefaultRouter()
 
@@ -39,4 +39,6 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', confirm_email, name='confirm_email'),
     path('v1/auth/token/', get_token, name='get_token'),
+    path('v1/export/titles/', export_titles, name='export_titles'),
+    path('v1/slow-requests/', get_slow_requests, name='slow_requests'),
 ]
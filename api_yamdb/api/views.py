@@ -1,9 +1,8 @@
-import datetime as dt
-
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
-from django.db.models import Avg
-from django.utils import timezone
+from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.generics import get_object_or_404
@@ -12,22 +11,29 @@ from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import (Category, EmailAndCode, Genre, Review, Title, User,
-                            UserRole)
-
-from api_yamdb.settings import DEFAULT_FROM_EMAIL
-
-from .filters import TitleFilter
+from reviews.models import (Category, Comment, EmailAndCode, Genre, Review,
+                            Title, User, UserRole)
+
+from .bulk import BulkWriteMixin, SlugBulkWriter, TitleBulkWriter
+from .cache import CachedListMixin, CachedRetrieveMixin
+from .export import iter_catalogue, parse_flag
+from .fieldsets import SparseQuerysetMixin
+from .filters import StableOrderingFilter, TitleFilter
+from .instrumentation import slow_request_log
+from .nested import NestedResourceMixin
+from .pagination import CursorOrLimitOffsetPagination
 from .permissions import (AdminModifyOrReadOnlyPermission, IsAdmin,
                           ReviewAndComment)
+from .replicas import ReplicaReadMixin
 from .serializers import (CategorySerializer, CommentSerializer,
                           ConfirmEmailSerializer, GenreSerializer,
                           GetTokenSerializer, ReadTitleSerializer,
                           ReviewSerializer, UserSerializer,
                           WriteTitleSerializer)
+from .throttling import throttle_scope
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = LimitOffsetPagination
@@ -45,7 +51,7 @@ class UserViewSet(viewsets.ModelViewSet):
     def me(self, request):
         """API для получения и редактирования
         текущим пользователем своих данных"""
-        user = request.user
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -56,26 +62,27 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@throttle_scope('token')
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def get_token(request):
-    EmailAndCode.objects.filter(expire_date__lte=timezone.now()).delete()
-
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    username = serializer.validated_data.get('username')
-    conf_user = get_object_or_404(EmailAndCode, username=username)
-    conf_code = serializer.validated_data.get('confirmation_code')
-    user = get_object_or_404(User, username=conf_user.username)
+    username = serializer.validated_data['username']
+    conf_code = serializer.validated_data['confirmation_code']
+    user = get_object_or_404(User, username=username)
 
     token_generator = PasswordResetTokenGenerator()
-    if token_generator.check_token(user=user, token=conf_code):
-        conf_user = get_object_or_404(
-            EmailAndCode,
+    # Код гасится тем же DELETE, которым проверяется: повторно
+    # его не использовать даже при параллельных запросах.
+    code_is_valid = (
+        token_generator.check_token(user=user, token=conf_code)
+        and EmailAndCode.objects.active().filter(
             username=username,
             confirm_code=conf_code
-        )
-        conf_user.delete()
+        ).delete()[0]
+    )
+    if code_is_valid:
         token = AccessToken.for_user(user)
         return Response({'token': str(token)},
                         status=status.HTTP_200_OK)
@@ -83,47 +90,54 @@ def get_token(request):
                     status=status.HTTP_400_BAD_REQUEST)
 
 
+@throttle_scope('signup')
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def confirm_email(request):
-    EmailAndCode.objects.filter(expire_date__lte=timezone.now()).delete()
-
     serializer = ConfirmEmailSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return Response(
+        data=serializer.data,
+        status=status.HTTP_200_OK
+    )
 
-    email = serializer.validated_data.get('email')
-    username = serializer.validated_data.get('username')
-    expr_date = timezone.now() + dt.timedelta(minutes=5)
-
-    user = User.objects.create_user(username=username,
-                                    email=email)
-    token_generator = PasswordResetTokenGenerator()
-    conf_code = token_generator.make_token(user=user)
 
-    send_mail(
-        'Email confirmation',
-        f'Your confirmation code: {conf_code}',
-        DEFAULT_FROM_EMAIL,
-        [user.email, ],
+@api_view(['GET'])
+@permission_classes([AdminModifyOrReadOnlyPermission])
+def export_titles(request):
+    """Выгрузка каталога в NDJSON, по строке на произведение."""
+    response = StreamingHttpResponse(
+        iter_catalogue(
+            include_reviews=parse_flag(request.query_params.get('reviews'))
+        ),
+        content_type='application/x-ndjson; charset=utf-8'
     )
+    response['Content-Disposition'] = 'attachment; filename="titles.ndjson"'
+    return response
 
-    serializer.save(confirm_code=conf_code,
-                    expire_date=expr_date)
 
-    return Response(
-        data={'email': email, 'username': username},
-        status=status.HTTP_200_OK
-    )
+@api_view(['GET'])
+@permission_classes([AdminModifyOrReadOnlyPermission])
+def get_slow_requests(request):
+    """Медленные запросы текущего процесса, новые первыми."""
+    return Response(list(reversed(slow_request_log)))
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, NestedResourceMixin,
+                    SparseQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('pub_date', 'id')
+    filter_backends = (StableOrderingFilter,)
+    ordering_fields = ('comments_count', 'score', 'pub_date', 'id')
     permission_classes = [ReviewAndComment, IsAuthenticatedOrReadOnly]
-
-    def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs['title_id'])
-        return title.reviews.all()
+    parent_model = Title
+    parent_lookups = {'id': 'title_id'}
+    parent_field = 'title_id'
+    throttle_scope = 'review'
+    throttle_actions = ('create',)
 
     def get_serializer_context(self):
         context = super(ReviewViewSet, self).get_serializer_context()
@@ -131,38 +145,80 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return context
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title,
-                                  id=self.kwargs['title_id'])
-        author = self.request.user
-        serializer.save(title=title,
-                        author=author)
-
+        # Пользователь уже загружен аутентификацией, повторно
+        # из базы он не читается.
+        with transaction.atomic():
+            review = serializer.save(author=self.request.user,
+                                     **self.get_parent_values())
+            self.update_title_rating(review.title_id, review.score, 1)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_score = Review.objects.select_for_update().values_list(
+                'score', flat=True
+            ).get(id=serializer.instance.id)
+            review = serializer.save()
+            self.update_title_rating(review.title_id,
+                                     review.score - old_score, 0)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            review = Review.objects.select_for_update().filter(
+                id=instance.id
+            ).first()
+            if review is None:
+                return
+            review.delete()
+            self.update_title_rating(review.title_id, -review.score, -1)
+
+    @staticmethod
+    def update_title_rating(title_id, score_delta, count_delta):
+        """Сдвигает сохранённые сумму оценок и число отзывов
+        произведения одним UPDATE без пересчёта Avg."""
+        if title_id is None or not (score_delta or count_delta):
+            return
+        Title.objects.filter(id=title_id).update(
+            score_sum=F('score_sum') + score_delta,
+            reviews_count=F('reviews_count') + count_delta
+        )
 
-class CommentViewSet(viewsets.ModelViewSet):
 
+class CommentViewSet(ReplicaReadMixin, NestedResourceMixin,
+                     SparseQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('pub_date', 'id')
     permission_classes = [ReviewAndComment, IsAuthenticatedOrReadOnly]
-
-    def get_queryset(self):
-        title = get_object_or_404(Title,
-                                  id=self.kwargs['title_id'])
-        review = get_object_or_404(Review,
-                                   id=self.kwargs['review_id'],
-                                   title__id=title.id)
-        return review.comments.all()
+    parent_model = Review
+    parent_lookups = {'id': 'review_id', 'title_id': 'title_id'}
+    parent_field = 'review_id_id'
+    throttle_scope = 'comment'
+    throttle_actions = ('create',)
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review,
-                                   id=self.kwargs['review_id'])
-        author = get_object_or_404(User,
-                                   username=self.request.user)
-
-        serializer.save(review_id=review,
-                        author=author)
+        with transaction.atomic():
+            comment = serializer.save(author=self.request.user,
+                                      **self.get_parent_values())
+            self.update_comments_count(comment.review_id_id, 1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            if Comment.objects.filter(id=instance.id).delete()[0]:
+                self.update_comments_count(instance.review_id_id, -1)
+
+    @staticmethod
+    def update_comments_count(review_id, delta):
+        """Сдвигает счётчик комментариев отзыва одним UPDATE."""
+        if review_id is None:
+            return
+        Review.objects.filter(id=review_id).update(
+            comments_count=F('comments_count') + delta
+        )
 
 
-class ListCreateDeleteViewSet(mixins.ListModelMixin,
+class ListCreateDeleteViewSet(CachedListMixin,
+                              mixins.ListModelMixin,
                               mixins.CreateModelMixin,
                               mixins.DestroyModelMixin,
                               viewsets.GenericViewSet):
@@ -174,23 +230,33 @@ class ListCreateDeleteViewSet(mixins.ListModelMixin,
     lookup_field = 'slug'
 
 
-class CategoryViewSet(ListCreateDeleteViewSet):
+class CategoryViewSet(ReplicaReadMixin, BulkWriteMixin,
+                      ListCreateDeleteViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_writer_class = SlugBulkWriter
 
 
-class GenreViewSet(ListCreateDeleteViewSet):
+class GenreViewSet(ReplicaReadMixin, BulkWriteMixin,
+                   ListCreateDeleteViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    bulk_writer_class = SlugBulkWriter
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).all()
+class TitleViewSet(ReplicaReadMixin, BulkWriteMixin, CachedListMixin,
+                   CachedRetrieveMixin, SparseQuerysetMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genres')
     permission_classes = [IsAdmin]
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('id',)
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('reviews_count', 'year', 'name', 'id')
+    bulk_writer_class = TitleBulkWriter
 
     def get_serializer_class(self):
         if self.action == 'list' or self.action == 'retrieve':
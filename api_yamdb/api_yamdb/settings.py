@@ -35,6 +35,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.instrumentation.RequestTimingMiddleware',
+    'api.compression.CompressionMiddleware',
+    'api.throttling.LoadSheddingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,10 +79,72 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', default=0)),
+        'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
     }
 }
 
+# Реплики только для чтения через запятую: хосты PostgreSQL,
+# а для SQLite пути к файлам баз.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1
+):
+    replica_setting = (
+        'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3')
+        else 'HOST'
+    )
+    DATABASES[f'replica{number}'] = dict(
+        DATABASES['default'], **{replica_setting: replica.strip()}
+    )
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+DB_REPLICA_LAG = float(os.getenv('DB_REPLICA_LAG', default=5))
+
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', default='True'
+) == 'True'
+
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', default=os.path.join(BASE_DIR, 'cache')
+        ),
+    },
+    # Вёдра ограничения частоты отдельно от кэша ответов: ключи ответов
+    # создаёт любой клиент через строку запроса, и при вытеснении
+    # старых записей вместе с ними пропадали бы и вёдра.
+    'throttle': {
+        'BACKEND': os.getenv(
+            'THROTTLE_CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'THROTTLE_CACHE_LOCATION',
+            default=os.path.join(BASE_DIR, 'throttle_cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('THROTTLE_CACHE_MAX_ENTRIES',
+                                         default=100000)),
+        },
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=600))
+
 
 # Password validation
 
@@ -114,7 +180,9 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATICFILES_STORAGE = 'api.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -125,13 +193,42 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
 
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.IPTokenBucketThrottle',
+        'api.throttling.UserTokenBucketThrottle',
+    ],
+
+    # Ограничиваются только обработчики с throttle_scope.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup.ip': os.getenv('THROTTLE_SIGNUP_IP', default='5/min'),
+        'token.ip': os.getenv('THROTTLE_TOKEN_IP', default='10/min'),
+        'review.ip': os.getenv('THROTTLE_REVIEW_IP', default='30/min'),
+        'review.user': os.getenv('THROTTLE_REVIEW_USER', default='10/min'),
+        'comment.ip': os.getenv('THROTTLE_COMMENT_IP', default='60/min'),
+        'comment.user': os.getenv('THROTTLE_COMMENT_USER', default='20/min'),
+    },
+
+    # Адрес клиента берётся из X-Forwarded-For, который ставит nginx.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
+
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
 
@@ -142,6 +239,41 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+BULK_WRITE_MAX_ITEMS = int(os.getenv('BULK_WRITE_MAX_ITEMS', default=1000))
+
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', default=10000))
+
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', default=60))
+
+USER_CACHE_ALIAS = 'default'
+
+SERVER_TIMING = os.getenv('SERVER_TIMING', default='False') == 'True'
+
+SLOW_REQUEST_THRESHOLD_MS = float(
+    os.getenv('SLOW_REQUEST_THRESHOLD_MS', default=500)
+)
+
+SLOW_QUERY_THRESHOLD_MS = float(
+    os.getenv('SLOW_QUERY_THRESHOLD_MS', default=100)
+)
+
+SLOW_REQUEST_LOG_SIZE = int(os.getenv('SLOW_REQUEST_LOG_SIZE', default=100))
+
+METRICS_DIR = os.getenv('METRICS_DIR')
+
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+LOAD_SHED_QUEUE_MS = float(os.getenv('LOAD_SHED_QUEUE_MS', default=2000))
+
+LOAD_SHED_POOL_RATIO = float(os.getenv('LOAD_SHED_POOL_RATIO', default=1))
+
+LOAD_SHED_RETRY_AFTER = int(os.getenv('LOAD_SHED_RETRY_AFTER', default=1))
+
+# orjson, если установлен, или стандартный json.
+JSON_BACKEND = os.getenv('JSON_BACKEND', default='orjson')
+
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', default=1024))
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -1,3 +1,5 @@
+from api.health import readiness_view
+from api.metrics import metrics_view
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
@@ -5,6 +7,8 @@ from django.views.generic import TemplateView
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('health/ready', readiness_view, name='readiness'),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
@@ -0,0 +1,91 @@
+"""
+Настройки gunicorn для продакшена. Gunicorn читает этот файл сам,
+если запускается из каталога проекта, или через --config.
+Все значения можно переопределить переменными окружения.
+"""
+import glob
+import multiprocessing
+import os
+
+WORKER_CLASSES = ('sync', 'gthread')
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:8000')
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='sync')
+if worker_class not in WORKER_CLASSES:
+    raise ValueError(
+        f'GUNICORN_WORKER_CLASS должен быть одним из {WORKER_CLASSES}'
+    )
+
+# Синхронным воркерам нужен запас процессов на время ожидания базы,
+# у gthread его дают потоки, поэтому процессов по числу ядер.
+cpu_count = multiprocessing.cpu_count()
+workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    default=cpu_count if worker_class == 'gthread' else cpu_count * 2 + 1
+))
+threads = int(os.getenv(
+    'GUNICORN_THREADS', default=4 if worker_class == 'gthread' else 1
+))
+
+# Код приложения импортируется один раз в мастере и делится
+# с воркерами через copy-on-write.
+preload_app = os.getenv('GUNICORN_PRELOAD', default='True') == 'True'
+
+# Перезапуск воркера после max_requests запросов ограничивает
+# рост памяти, jitter разносит перезапуски воркеров во времени.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER',
+                                    default=100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', default=30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', default='-')
+errorlog = '-'
+
+
+def on_starting(server):
+    """Метрики прошлого запуска не должны суммироваться с новыми."""
+    metrics_dir = os.getenv('METRICS_DIR')
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, 'metrics_*.db')):
+            os.remove(path)
+
+
+def when_ready(server):
+    """
+    С preload_app приложение уже загружено в мастере: заранее
+    строится URL-резолвер, чтобы воркеры получили его готовым.
+    Соединения с базой закрываются до fork, иначе воркеры
+    унаследуют один сокет.
+    """
+    if not preload_app:
+        return
+    from django.db import connections
+    from django.urls import get_resolver
+
+    get_resolver()._populate()
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    """Первый запрос воркера не должен ждать соединения с базой
+    и первого обращения к кэшу."""
+    from api.cache import get_catalogue_version
+    from django.db import connection
+
+    try:
+        connection.ensure_connection()
+        get_catalogue_version()
+    except Exception as error:
+        worker.log.warning('Прогрев воркера не удался: %s', error)
+
+
+def child_exit(server, worker):
+    """Счётчики завершившегося воркера переносятся в общий файл
+    мастера, чтобы при max_requests файлы не копились."""
+    if os.getenv('METRICS_DIR') and preload_app:
+        from api.metrics import merge_worker_metrics
+        merge_worker_metrics(worker.pid)
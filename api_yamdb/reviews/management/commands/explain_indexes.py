@@ -0,0 +1,124 @@
+import datetime as dt
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.utils import timezone
+from reviews.models import (Category, Comment, EmailAndCode, Genre, GenreTitle,
+                            Review, Title, User)
+
+INDEX_MIGRATIONS = (
+    ('reviews', '0004_hot_path_indexes'),
+    ('api', '0002_email_and_code_indexes'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Заполняет временную тестовую базу синтетическими данными '
+            'и печатает планы горячих запросов до и после миграций '
+            'с индексами')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=2000,
+                            help='Количество произведений')
+        parser.add_argument('--reviews-per-title', type=int, default=10,
+                            help='Количество отзывов на произведение')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.seed(options['titles'], options['reviews_per_title'])
+            for app_label, name in INDEX_MIGRATIONS:
+                call_command('migrate', app_label,
+                             self.previous_migration(app_label, name),
+                             verbosity=0)
+            self.explain('До миграций с индексами')
+            call_command('migrate', verbosity=0)
+            self.explain('После миграций с индексами')
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    @staticmethod
+    def previous_migration(app_label, name):
+        migration = MigrationLoader(connection).get_migration(app_label, name)
+        for dependency_app, dependency in migration.dependencies:
+            if dependency_app == app_label:
+                return dependency
+        return 'zero'
+
+    def seed(self, titles_count, reviews_per_title):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(20)
+        ]
+        User.objects.bulk_create(
+            User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+            for number in range(reviews_per_title)
+        )
+        users = list(User.objects.values_list('id', flat=True))
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000,
+                  category=category)
+            for number in range(titles_count)
+        )
+        title_ids = list(Title.objects.values_list('id', flat=True))
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id_id=title_id,
+                       genre_id=genres[title_id % len(genres)])
+            for title_id in title_ids
+        )
+        Review.objects.bulk_create(
+            Review(title_id=title_id, author_id=author_id,
+                   text='Отзыв', score=author_id % 10 + 1)
+            for title_id in title_ids
+            for author_id in users
+        )
+        review_ids = Review.objects.values_list('id', flat=True)[:1000]
+        Comment.objects.bulk_create(
+            Comment(review_id_id=review_id, author_id=users[0],
+                    text='Комментарий')
+            for review_id in review_ids
+            for _ in range(5)
+        )
+        now = timezone.now()
+        EmailAndCode.objects.bulk_create(
+            EmailAndCode(username=f'new{number}',
+                         email=f'new{number}@yamdb.fake',
+                         confirm_code='code',
+                         expire_date=now + dt.timedelta(minutes=number - 50))
+            for number in range(titles_count)
+        )
+
+    def get_hot_queries(self):
+        title_id = Title.objects.values_list('id', flat=True).last()
+        review_id = Review.objects.values_list('id', flat=True).first()
+        return (
+            ('Отзывы произведения по дате',
+             Review.objects.filter(title_id=title_id).order_by(
+                 'pub_date', 'id'
+             ).values('id', 'pub_date')[:10]),
+            ('Комментарии к отзыву по дате',
+             Comment.objects.filter(review_id=review_id).order_by(
+                 'pub_date', 'id'
+             ).values('id', 'pub_date')[:10]),
+            ('Фильтр произведений по жанру',
+             Title.objects.filter(genres__slug='genre-3').values('id')[:10]),
+            ('Код подтверждения по username',
+             EmailAndCode.objects.filter(username='new7').values('id')),
+            ('Просроченные коды подтверждения',
+             EmailAndCode.objects.filter(
+                 expire_date__lte=timezone.now()
+             ).values('id')),
+        )
+
+    def explain(self, header):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(self.style.MIGRATE_HEADING(header))
+        for name, queryset in self.get_hot_queries():
+            self.stdout.write(self.style.SUCCESS(name))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
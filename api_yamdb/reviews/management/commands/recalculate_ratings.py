@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сумму оценок и количество отзывов '
+            'у произведений пачками по диапазонам id')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений, обновляемых в одной транзакции'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Title.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        updated = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                updated += Title.objects.filter(
+                    id__gt=start, id__lte=start + batch_size
+                ).update(
+                    score_sum=Coalesce(Subquery(
+                        reviews.annotate(total=Sum('score')).values('total')
+                    ), 0),
+                    reviews_count=Coalesce(Subquery(
+                        reviews.annotate(total=Count('id')).values('total')
+                    ), 0),
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитан рейтинг {updated} произведений')
+        )
@@ -0,0 +1,45 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from reviews.models import Comment, Review
+
+
+class Command(BaseCommand):
+    help = ('Сверяет счётчики отзывов у произведений и комментариев '
+            'у отзывов с фактическим числом строк и исправляет '
+            'расхождения пачками по диапазонам id')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество объектов, обновляемых в одной транзакции'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        call_command('recalculate_ratings', batch_size=batch_size,
+                     stdout=self.stdout)
+        last_id = Review.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        actual = Coalesce(Subquery(
+            Comment.objects.filter(
+                review_id=OuterRef('pk')
+            ).order_by().values('review_id').annotate(
+                total=Count('id')
+            ).values('total')
+        ), 0)
+        drifted = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                batch = Review.objects.filter(id__gt=start,
+                                              id__lte=start + batch_size)
+                drifted += batch.annotate(actual=actual).exclude(
+                    comments_count=F('actual')
+                ).count()
+                batch.update(comments_count=actual)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков комментариев: {drifted}'
+        ))
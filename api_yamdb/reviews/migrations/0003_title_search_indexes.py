@@ -0,0 +1,21 @@
+from django.db import migrations
+from reviews.search import create_search_indexes, drop_search_indexes
+
+
+def forwards(apps, schema_editor):
+    create_search_indexes(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    drop_search_indexes(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
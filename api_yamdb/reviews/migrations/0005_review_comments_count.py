@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:09
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = Comment.objects.filter(
+        review_id=OuterRef('pk')
+    ).order_by().values('review_id')
+    Review.objects.update(comments_count=Coalesce(Subquery(
+        comments.annotate(total=Count('id')).values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество комментариев к отзыву'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['reviews_count', 'id'], name='title_reviews_count_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from .validators import validate_year
 
@@ -159,9 +160,31 @@ class Title(models.Model):
         through='GenreTitle',
     )
 
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок произведения',
+        default=0
+    )
+
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов на произведение',
+        default=0
+    )
+
     class Meta:
         verbose_name = 'title'
         verbose_name_plural = 'titles'
+        indexes = [
+            models.Index(
+                fields=['reviews_count', 'id'],
+                name='title_reviews_count_idx'
+            )
+        ]
+
+    @property
+    def rating(self):
+        if not self.reviews_count:
+            return None
+        return self.score_sum / self.reviews_count
 
 
 class Review(models.Model):
@@ -187,6 +210,10 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         'Дата публикации',
         auto_now_add=True,)
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев к отзыву',
+        default=0
+    )
 
     class Meta:
 
@@ -198,6 +225,12 @@ class Review(models.Model):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date'],
+                name='review_title_pub_date_idx'
+            )
+        ]
 
 
 class Comment(models.Model):
@@ -224,6 +257,12 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'comment'
         verbose_name_plural = 'comments'
+        indexes = [
+            models.Index(
+                fields=['review_id', 'pub_date'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
 
 
 class GenreTitle(models.Model):
@@ -242,15 +281,61 @@ class GenreTitle(models.Model):
     class Meta:
         verbose_name = 'genre_title'
         verbose_name_plural = 'genres_titles'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title_id', 'genre_id'],
+                name='unique_genre_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['genre_id', 'title_id'],
+                name='genre_title_genre_idx'
+            )
+        ]
+
+
+class EmailAndCodeQuerySet(models.QuerySet):
+
+    def active(self):
+        """Коды, срок действия которых ещё не истёк."""
+        return self.filter(expire_date__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expire_date__lte=timezone.now())
 
 
 class EmailAndCode(models.Model):
-    username = models.CharField(max_length=25)
+    username = models.CharField(max_length=25, db_index=True)
     email = models.EmailField(unique=True)
-    confirm_code = models.CharField(max_length=16)
-    expire_date = models.DateTimeField(null=True)
+    confirm_code = models.CharField(max_length=64)
+    expire_date = models.DateTimeField(null=True, db_index=True)
+
+    objects = EmailAndCodeQuerySet.as_manager()
 
     class Meta:
         app_label = 'api'
         verbose_name = 'email_and_code'
         verbose_name_plural = 'emails_and_codes'
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.EmailField()
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        app_label = 'api'
+        verbose_name = 'outgoing_email'
+        verbose_name_plural = 'outgoing_emails'
+        indexes = [
+            models.Index(
+                fields=['send_after', 'attempts'],
+                name='outgoing_email_pending_idx'
+            )
+        ]
@@ -0,0 +1,125 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+
+POSTGRES_VECTOR = (
+    "to_tsvector('{config}', coalesce({prefix}name, '') || ' ' "
+    "|| coalesce({prefix}description, ''))"
+)
+
+POSTGRES_CREATE_INDEXES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx '
+    'ON reviews_title USING GIN ('
+    + POSTGRES_VECTOR.format(config=SEARCH_CONFIG, prefix='')
+    + ')',
+    'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm_idx '
+    'ON reviews_title USING GIN (name gin_trgm_ops)',
+]
+
+POSTGRES_DROP_INDEXES = [
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_title_search_idx',
+]
+
+SQLITE_CREATE_INDEXES = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5('
+    'name, description, content=reviews_title, content_rowid=id, '
+    "tokenize='unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert '
+    'AFTER INSERT ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete '
+    'AFTER DELETE ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update '
+    'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_INDEXES = [
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+]
+
+
+def create_search_indexes(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {
+        'postgresql': POSTGRES_CREATE_INDEXES,
+        'sqlite': SQLITE_CREATE_INDEXES,
+    }.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {
+        'postgresql': POSTGRES_DROP_INDEXES,
+        'sqlite': SQLITE_DROP_INDEXES,
+    }.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def get_fts5_query(query):
+    """Каждое слово запроса превращается в префиксный терм FTS5,
+    так что спецсимволы пользователя не ломают синтаксис MATCH."""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, query):
+    """
+    Ранжированный поиск произведений по названию и описанию.
+    На PostgreSQL использует GIN-индексы tsvector и pg_trgm,
+    на SQLite — таблицу FTS5, на остальных СУБД — icontains.
+    """
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        vector = POSTGRES_VECTOR.format(config=SEARCH_CONFIG,
+                                        prefix=f'{table}.')
+        tsquery = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f'ts_rank({vector}, {tsquery}) '
+                f'+ similarity({table}.name, %s)',
+                (query, query)
+            )
+        ).extra(
+            where=[f'{table}.id IN (SELECT id FROM {table} '
+                   f'WHERE {vector} @@ {tsquery} OR name %% %s)'],
+            params=(query, query)
+        ).order_by('-search_rank', 'id')
+    if connection.vendor == 'sqlite':
+        match = get_fts5_query(query)
+        if not match:
+            return queryset.none()
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({table}_fts) FROM {table}_fts '
+                f'WHERE {table}_fts MATCH %s AND rowid = {table}.id',
+                (match,)
+            )
+        ).extra(
+            where=[f'{table}.id IN (SELECT rowid FROM {table}_fts '
+                   f'WHERE {table}_fts MATCH %s)'],
+            params=(match,)
+        ).order_by('-search_rank', 'id')
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    )
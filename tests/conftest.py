@@ -1,9 +1,79 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """Тесты с базой данных гоняются на SQLite в памяти,
+    чтобы для них не требовался запущенный PostgreSQL. Вторая
+    база replica изображает реплику для тестов маршрутизации чтения,
+    запросы в неё идут, только если тест включит DATABASE_REPLICAS."""
+    from django.conf import settings
+    from django.db import connections
+
+    settings.DATABASES = {
+        alias: dict(db, ENGINE='django.db.backends.sqlite3', NAME=':memory:')
+        for alias, db in settings.DATABASES.items()
+    }
+    settings.DATABASES['replica'] = dict(settings.DATABASES['default'])
+    connections._databases = None
+    connections.__dict__.pop('databases', None)
+    for alias in settings.DATABASES:
+        if hasattr(connections._connections, alias):
+            delattr(connections._connections, alias)
+
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    """Каждый тест получает пустой кэш в памяти процесса."""
+    from django.core.cache import cache, caches
+
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'yamdb-tests',
+        },
+        'throttle': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'yamdb-tests-throttle',
+        },
+    }
+    caches['throttle'].clear()
+    cache.clear()
+    yield cache
+    cache.clear()
+    caches['throttle'].clear()
+
+
+@pytest.fixture(autouse=True)
+def user_cache():
+    """Идентификаторы пользователей повторяются между тестами,
+    поэтому кэш аутентификации сбрасывается перед каждым."""
+    from api.authentication import user_cache
+
+    user_cache.clear()
+    yield user_cache
+    user_cache.clear()
+
+
+def _count_statements(context):
+    """SAVEPOINT от транзакции теста в бюджет запросов не входят."""
+    return sum(not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+               for query in context.captured_queries)
+
+
+@pytest.fixture
+def count_statements():
+    """Число SQL-запросов из CaptureQueriesContext без SAVEPOINT."""
+    return _count_statements
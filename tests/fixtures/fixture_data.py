@@ -0,0 +1,51 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(name='Побег из Шоушенка', year=1994,
+                                 category=category)
+    title.genres.set(genres)
+    return title
+
+
+@pytest.fixture
+def catalogue(category, genres, user, another_user):
+    """Двадцать произведений с отзывами и комментариями,
+    чтобы N+1 запросы были заметны по их количеству."""
+    from reviews.models import Comment, Review, Title
+
+    titles = [
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             category=category, description='Описание')
+        for number in range(20)
+    ]
+    for title in titles:
+        title.genres.set(genres)
+    first_title = titles[0]
+    reviews = [
+        Review.objects.create(title=first_title, author=author,
+                              text='Отзыв', score=5)
+        for author in (user, another_user)
+    ]
+    Comment.objects.bulk_create(
+        Comment(review_id=reviews[0], author=author, text='Комментарий')
+        for author in (user, another_user) * 10
+    )
+    return first_title, reviews[0]
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.mark.django_db
+class TestAuth:
+
+    def signup(self, client, username='newuser', email=None):
+        return client.post(SIGNUP_URL, {
+            'username': username, 'email': email or f'{username}@yamdb.fake'
+        })
+
+    def get_code(self, username='newuser'):
+        from reviews.models import EmailAndCode
+        return EmailAndCode.objects.get(username=username).confirm_code
+
+    def test_signup_has_no_reads(self, client, count_statements):
+        with CaptureQueriesContext(connection) as context:
+            response = self.signup(client)
+        assert response.status_code == 200
+        assert response.json() == {'username': 'newuser',
+                                   'email': 'newuser@yamdb.fake'}
+        assert count_statements(context) == 3, (
+            'Проверьте, что регистрация делает только три INSERT: '
+            'пользователь, код подтверждения и письмо в outbox'
+        )
+        assert not any(query['sql'].startswith('SELECT')
+                       for query in context.captured_queries)
+
+    def test_signup_conflicts(self, client, user):
+        response = self.signup(client, user.username)
+        assert response.status_code == 400
+        assert 'username' in response.json()
+        response = self.signup(client, 'other', user.email)
+        assert response.status_code == 400
+        assert list(response.json()) == ['email']
+        assert self.signup(client, 'me').status_code == 400
+
+    def test_signup_replaces_stale_code(self, client, django_user_model):
+        self.signup(client)
+        django_user_model.objects.filter(username='newuser').delete()
+        assert self.signup(client, 'renamed', 'newuser@yamdb.fake'
+                           ).status_code == 200
+
+    def test_token_exchange(self, client, count_statements):
+        self.signup(client)
+        code = self.get_code()
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(TOKEN_URL, {'username': 'newuser',
+                                               'confirmation_code': code})
+        assert response.status_code == 200
+        assert 'token' in response.json()
+        assert count_statements(context) <= 2, (
+            'Проверьте, что обмен кода на токен укладывается в два запроса'
+        )
+        response = client.post(TOKEN_URL, {'username': 'newuser',
+                                           'confirmation_code': code})
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения нельзя использовать повторно'
+        )
+
+    def test_token_errors(self, client):
+        self.signup(client)
+        assert client.post(TOKEN_URL, {
+            'username': 'nobody', 'confirmation_code': 'code'
+        }).status_code == 404
+        assert client.post(TOKEN_URL, {
+            'username': 'newuser', 'confirmation_code': 'wrong'
+        }).status_code == 400
+        assert client.post(TOKEN_URL, {}).status_code == 400
@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchmarks:
+
+    def test_seed_is_skewed(self):
+        from api.benchmarks import seed_catalogue
+        from reviews.models import Review, Title
+
+        ids = seed_catalogue(titles=30, reviews=300, comments=20, users=40)
+        counts = sorted(Title.objects.values_list('reviews_count',
+                                                  flat=True), reverse=True)
+        assert Title.objects.get(id=ids['title']).reviews_count == counts[0]
+        assert counts[0] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределены с перекосом'
+        )
+        assert sum(counts) == Review.objects.count(), (
+            'Проверьте, что после заполнения пересчитываются рейтинги'
+        )
+
+    def test_runner_covers_routes(self):
+        from api.benchmarks import (BenchmarkRunner, get_percentile,
+                                    get_scenarios, seed_catalogue)
+
+        ids = seed_catalogue(titles=10, reviews=40, comments=10, users=10)
+        runner = BenchmarkRunner(requests=3, warmup=1)
+        results = {scenario.name: runner.run(scenario)
+                   for scenario in get_scenarios(ids)}
+        assert results['reviews-list']['queries'] > 0, (
+            'Проверьте, что считаются SQL-запросы сценария'
+        )
+        assert {'titles-bulk', 'genres-bulk', 'categories-bulk',
+                'slow-requests', 'review-create', 'review-update',
+                'review-delete'} <= set(results), (
+            'Проверьте, что замеряются все маршруты API, включая запись'
+        )
+        for result in results.values():
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert get_percentile([1, 2, 3, 4], 50) == 2
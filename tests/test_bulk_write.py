@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    def test_bulk_create_genres(self, admin_client, genres,
+                                django_assert_max_num_queries):
+        payload = [{'name': f'Жанр {number}', 'slug': f'genre-{number}'}
+                   for number in range(50)]
+        payload.append({'name': 'Драма', 'slug': 'drama'})
+        payload.append({'name': 'Без slug'})
+        with django_assert_max_num_queries(5):
+            response = admin_client.post('/api/v1/genres/bulk/', payload,
+                                         format='json')
+        assert response.status_code == 207, (
+            'Проверьте, что при частичных ошибках возвращается статус 207'
+        )
+        results = response.json()
+        assert [result['status'] for result in results[-3:]] == [
+            200, 400, 400
+        ], 'Проверьте, что ошибки возвращаются на позициях элементов'
+        assert 'slug' in results[-2]['errors']
+
+        from reviews.models import Genre
+        assert Genre.objects.count() == 52
+
+    def test_bulk_create_titles(self, admin_client, category, genres):
+        payload = [
+            {'name': f'Произведение {number}', 'year': 2000,
+             'category': 'movie', 'genre': ['drama', 'comedy']}
+            for number in range(10)
+        ]
+        payload.append({'name': 'Неизвестное', 'year': 2000,
+                        'category': 'book', 'genre': ['horror']})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/bulk/', payload,
+                                         format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert set(results[-1]['errors']) == {'category', 'genre'}
+        assert results[0]['data']['genre'] == ['drama', 'comedy']
+
+        queries = [query['sql'] for query in context.captured_queries]
+        assert sum('"reviews_genre"' in sql and sql.startswith('SELECT')
+                   for sql in queries) == 1, (
+            'Проверьте, что slug жанров разрешаются одним запросом'
+        )
+        assert sum('"reviews_genretitle"' in sql and sql.startswith('INSERT')
+                   for sql in queries) == 1, (
+            'Проверьте, что связи с жанрами вставляются одним запросом'
+        )
+
+        from reviews.models import Title
+        title = Title.objects.get(id=results[0]['data']['id'])
+        assert sorted(title.genres.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+
+    def test_bulk_update_titles(self, admin_client, title):
+        response = admin_client.patch(
+            '/api/v1/titles/bulk/',
+            [{'id': title.id, 'name': 'Новое название', 'genre': ['drama']},
+             {'id': 0, 'name': 'Нет такого'}],
+            format='json'
+        )
+        assert response.status_code == 207
+        title.refresh_from_db()
+        assert title.name == 'Новое название'
+        assert list(title.genres.values_list('slug', flat=True)) == ['drama']
+
+    def test_bulk_requires_admin(self, user_client):
+        response = user_client.post('/api/v1/categories/bulk/',
+                                    [{'name': 'Книга', 'slug': 'book'}],
+                                    format='json')
+        assert response.status_code == 403
+
+    def test_bulk_rejects_object_payload(self, admin_client):
+        response = admin_client.post('/api/v1/categories/bulk/',
+                                     {'name': 'Книга', 'slug': 'book'},
+                                     format='json')
+        assert response.status_code == 400
@@ -0,0 +1,95 @@
+import gzip
+import os
+import re
+
+import pytest
+from django.core.management import call_command
+
+from .conftest import infra_dir_path
+
+
+@pytest.mark.django_db
+class TestResponseCompression:
+
+    def test_large_json_gzipped(self, client, catalogue):
+        plain = client.get('/api/v1/titles/', {'limit': 20})
+        response = client.get('/api/v1/titles/', {'limit': 20},
+                              HTTP_ACCEPT_ENCODING='gzip, deflate')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что большие JSON-ответы сжимаются gzip'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content
+        assert len(response.content) < len(plain.content)
+        assert response['ETag'].startswith('W/')
+
+    def test_small_response_not_compressed(self, client, category):
+        response = client.get('/api/v1/categories/',
+                              HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы меньше COMPRESSION_MIN_SIZE '
+            'не сжимаются'
+        )
+
+    def test_accept_encoding_respected(self, client, catalogue):
+        for header in ('', 'identity', 'gzip;q=0'):
+            response = client.get('/api/v1/titles/', {'limit': 20},
+                                  HTTP_ACCEPT_ENCODING=header)
+            assert not response.has_header('Content-Encoding'), (
+                f'Проверьте, что при Accept-Encoding: {header!r} '
+                'ответ не сжимается'
+            )
+
+    def test_streaming_export_gzipped(self, admin_client, catalogue,
+                                      settings):
+        settings.COMPRESSION_MIN_SIZE = 0
+        response = admin_client.get('/api/v1/export/titles/',
+                                    HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)
+        ).splitlines()
+        assert len(lines) == 20
+
+
+def test_choose_encoding(monkeypatch):
+    from api import compression
+
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert compression.choose_encoding('br, gzip') == 'gzip', (
+        'Проверьте, что без пакета brotli используется gzip'
+    )
+    assert compression.choose_encoding('br') is None
+    assert compression.choose_encoding('*') == 'gzip'
+
+
+def test_collectstatic_precompressed(settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+    call_command('collectstatic', interactive=False, verbosity=0)
+    names = os.listdir(tmp_path)
+    hashed = [name for name in names
+              if re.fullmatch(r'redoc\.[0-9a-f]{12}\.yaml', name)]
+    assert hashed, (
+        'Проверьте, что collectstatic сохраняет файлы с хэшем в имени'
+    )
+    with open(tmp_path / hashed[0], 'rb') as original:
+        data = original.read()
+    with open(tmp_path / f'{hashed[0]}.gz', 'rb') as compressed:
+        assert gzip.decompress(compressed.read()) == data, (
+            'Проверьте, что рядом со статикой лежит копия .gz'
+        )
+    assert 'staticfiles.json' in names
+
+
+def test_nginx_serves_precompressed_static():
+    with open(os.path.join(infra_dir_path, 'nginx', 'default.conf')) as f:
+        config = f.read()
+    assert 'gzip_static on' in config
+    assert 'immutable' in config
+
+
+def test_redoc_before_collectstatic(client, settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+    response = client.get('/redoc/')
+    assert response.status_code == 200
+    assert "spec-url='/static/redoc.yaml'" in response.content.decode()
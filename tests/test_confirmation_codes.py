@@ -0,0 +1,55 @@
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.fixture
+def confirmation_codes(user):
+    from reviews.models import EmailAndCode
+
+    now = timezone.now()
+    return [
+        EmailAndCode.objects.create(
+            username=f'user{number}', email=f'user{number}@yamdb.fake',
+            confirm_code='code',
+            expire_date=now + dt.timedelta(minutes=number - 5, seconds=30)
+        )
+        for number in range(10)
+    ]
+
+
+@pytest.mark.django_db
+class TestConfirmationCodes:
+
+    def test_expired_code_is_rejected(self, client, user):
+        from reviews.models import EmailAndCode
+
+        EmailAndCode.objects.create(
+            username=user.username, email=user.email, confirm_code='code',
+            expire_date=timezone.now() - dt.timedelta(seconds=1)
+        )
+        response = client.post('/api/v1/auth/token/', {
+            'username': user.username, 'confirmation_code': 'code'
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что просроченный код подтверждения не принимается'
+        )
+
+    def test_token_request_does_not_purge(self, client, confirmation_codes):
+        from reviews.models import EmailAndCode
+
+        client.post('/api/v1/auth/token/', {
+            'username': 'user0', 'confirmation_code': 'code'
+        })
+        assert EmailAndCode.objects.count() == 10, (
+            'Проверьте, что запрос токена не удаляет чужие просроченные коды'
+        )
+
+    def test_purge_in_batches(self, confirmation_codes):
+        from reviews.models import EmailAndCode
+
+        call_command('purge_confirmation_codes', batch_size=2)
+        assert EmailAndCode.objects.count() == 5
+        assert EmailAndCode.objects.active().count() == 5
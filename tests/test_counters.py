@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+
+    def comments_url(self, title, review_id):
+        return f'/api/v1/titles/{title.id}/reviews/{review_id}/comments/'
+
+    def test_comments_count_follows_comments(self, user_client,
+                                             another_user_client, title):
+        response = user_client.post(f'/api/v1/titles/{title.id}/reviews/',
+                                    {'text': 'Отлично', 'score': 10})
+        assert response.json()['comments_count'] == 0
+        review_id = response.json()['id']
+        url = self.comments_url(title, review_id)
+        comment_id = user_client.post(url, {'text': 'Первый'}).json()['id']
+        another_user_client.post(url, {'text': 'Второй'})
+        review_url = f'/api/v1/titles/{title.id}/reviews/{review_id}/'
+        assert user_client.get(review_url).json()['comments_count'] == 2, (
+            'Проверьте, что создание комментария увеличивает '
+            'comments_count отзыва'
+        )
+
+        user_client.delete(f'{url}{comment_id}/')
+        assert user_client.get(review_url).json()['comments_count'] == 1, (
+            'Проверьте, что удаление комментария уменьшает '
+            'comments_count отзыва'
+        )
+        title_data = user_client.get(f'/api/v1/titles/{title.id}/').json()
+        assert title_data['reviews_count'] == 1
+
+    def test_ordering_by_counters(self, client, user, another_user,
+                                  category):
+        from reviews.models import Comment, Review, Title
+
+        quiet, popular = (
+            Title.objects.create(name=name, year=2000, category=category)
+            for name in ('Тихое', 'Популярное')
+        )
+        Title.objects.filter(id=popular.id).update(reviews_count=2)
+        reviews = [
+            Review.objects.create(title=popular, author=author, text='a',
+                                  score=5)
+            for author in (user, another_user)
+        ]
+        Comment.objects.create(review_id=reviews[1], author=user, text='c')
+        Review.objects.filter(id=reviews[1].id).update(comments_count=1)
+
+        response = client.get('/api/v1/titles/',
+                              {'ordering': '-reviews_count'})
+        ids = [item['id'] for item in response.json()['results']]
+        assert ids == [popular.id, quiet.id], (
+            'Проверьте, что произведения сортируются по ?ordering='
+            '-reviews_count'
+        )
+
+        response = client.get(f'/api/v1/titles/{popular.id}/reviews/',
+                              {'ordering': '-comments_count', 'cursor': ''})
+        ids = [item['id'] for item in response.json()['results']]
+        assert ids == [reviews[1].id, reviews[0].id], (
+            'Проверьте, что отзывы сортируются по ?ordering='
+            '-comments_count и с курсорной пагинацией'
+        )
+
+    def test_reconcile_counters(self, user, another_user, title):
+        from reviews.models import Comment, Review, Title
+
+        review = Review.objects.create(title=title, author=user, text='a',
+                                       score=8)
+        Comment.objects.bulk_create(
+            Comment(review_id=review, author=author, text='c')
+            for author in (user, another_user, user)
+        )
+        Title.objects.filter(id=title.id).update(score_sum=0,
+                                                 reviews_count=0)
+
+        call_command('reconcile_counters', batch_size=1)
+
+        review.refresh_from_db()
+        title.refresh_from_db()
+        assert review.comments_count == 3
+        assert (title.score_sum, title.reviews_count) == (8, 1)
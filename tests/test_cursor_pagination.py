@@ -0,0 +1,94 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def collect_pages(self, client, url, limit):
+        ids = []
+        response = client.get(url, {'cursor': '', 'limit': limit})
+        while True:
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в курсорном режиме не выполняется COUNT(*)'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            if not data['next']:
+                return ids
+            response = client.get(data['next'])
+
+    def test_titles_cursor_walks_all_pages(self, admin_client, catalogue):
+        from reviews.models import Title
+
+        ids = self.collect_pages(admin_client, '/api/v1/titles/', 6)
+        assert ids == list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def test_comments_cursor_walks_all_pages(self, admin_client, catalogue):
+        title, review = catalogue
+        url = (f'/api/v1/titles/{title.id}/reviews/{review.id}'
+               f'/comments/')
+        ids = self.collect_pages(admin_client, url, 3)
+        assert ids == list(
+            review.comments.order_by('pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+
+    def test_cursor_page_skips_count(self, admin_client, catalogue,
+                                     django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/titles/', {'cursor': ''})
+        assert len(response.json()['results']) == 10
+
+    def test_limit_offset_still_default(self, admin_client, catalogue):
+        response = admin_client.get('/api/v1/titles/',
+                                    {'limit': 5, 'offset': 15})
+        data = response.json()
+        assert data['count'] == 20, (
+            'Проверьте, что без параметра cursor пагинация '
+            'осталась limit/offset'
+        )
+        assert len(data['results']) == 5
+
+    def test_tied_ordering_walks_all_rows(self, admin_client, category):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000,
+                  category=category)
+            for number in range(1300)
+        )
+        ids = self.collect_pages(
+            admin_client, '/api/v1/titles/?ordering=reviews_count', 200
+        )
+        assert ids == list(
+            Title.objects.order_by('reviews_count', 'id').values_list(
+                'id', flat=True
+            )
+        ), (
+            'Проверьте, что при равных значениях поля сортировки курсор '
+            'проходит все записи ровно один раз'
+        )
+
+    def test_previous_link_returns_same_page(self, admin_client,
+                                             catalogue):
+        url = '/api/v1/titles/?ordering=-reviews_count'
+        first = admin_client.get(url, {'cursor': '', 'limit': 6}).json()
+        second = admin_client.get(first['next']).json()
+        back = admin_client.get(second['previous']).json()
+        assert back['results'] == first['results']
+        assert back['previous'] is None
+
+    def test_broken_cursor(self, admin_client, catalogue):
+        from base64 import urlsafe_b64encode
+
+        cursor = urlsafe_b64encode(b'[false, ["abc", "1"]]').decode()
+        response = admin_client.get(
+            '/api/v1/titles/', {'cursor': cursor, 'ordering': 'year'}
+        )
+        assert response.status_code == 404
+        response = admin_client.get('/api/v1/titles/', {'cursor': '%%%'})
+        assert response.status_code == 404
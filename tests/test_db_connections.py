@@ -0,0 +1,144 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDatabaseConnections:
+
+    def test_readiness(self, client):
+        response = client.get('/health/ready')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['checks'] == {'database': 'ok', 'cache': 'ok'}
+        assert {'requests', 'reused', 'opened', 'dropped', 'reuse_ratio',
+                'conn_max_age'} <= set(data['connections']), (
+            'Проверьте, что готовность сообщает о переиспользовании '
+            'соединений'
+        )
+        assert data['pool'] is None
+
+    def test_dead_connection_dropped(self, monkeypatch, settings):
+        from api.health import check_connections, connection_stats
+        from django.db import connection
+
+        settings.DB_CONN_HEALTH_CHECKS = True
+        connection.ensure_connection()
+        closed = []
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        monkeypatch.setattr(connection, 'close',
+                            lambda: closed.append(True))
+        dropped = connection_stats['dropped']
+        check_connections()
+        assert not closed, (
+            'Проверьте, что соединение проверяется при первом курсоре, '
+            'а не в начале каждого запроса'
+        )
+        monkeypatch.setattr(connection, 'connect', lambda: None)
+        connection.ensure_connection()
+        assert closed, (
+            'Проверьте, что неработающее соединение закрывается '
+            'перед первым запросом к базе'
+        )
+        assert connection_stats['dropped'] == dropped + 1
+
+    def test_live_connection_reused(self, settings):
+        from api.health import check_connections, connection_stats
+        from django.db import connection, connections
+
+        settings.DB_CONN_HEALTH_CHECKS = True
+        connection.ensure_connection()
+        open_connections = sum(db.connection is not None
+                               for db in connections.all())
+        reused = connection_stats['reused']
+        check_connections()
+        assert connection.connection is not None
+        assert connection_stats['reused'] == reused + open_connections
+
+    def test_check_is_lazy(self, monkeypatch, settings):
+        from api.health import check_connections
+        from django.db import connection
+
+        settings.DB_CONN_HEALTH_CHECKS = True
+        connection.ensure_connection()
+        checks = []
+        monkeypatch.setattr(connection, 'is_usable',
+                            lambda: checks.append(True) or True)
+        check_connections()
+        assert not checks
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.execute('SELECT 1')
+        assert checks == [True], (
+            'Проверьте, что соединение проверяется один раз '
+            'при первом обращении к базе'
+        )
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        from psycopg2 import extensions
+
+        self.info = type('Info', (), {
+            'transaction_status': extensions.TRANSACTION_STATUS_IDLE
+        })()
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def blocking_pool(monkeypatch):
+    from api.db_pool.base import BlockingConnectionPool
+    from psycopg2 import pool
+
+    monkeypatch.setattr(pool.psycopg2, 'connect',
+                        lambda *args, **kwargs: FakeConnection())
+    return BlockingConnectionPool(1, 1, 0.05)
+
+
+class TestBlockingConnectionPool:
+
+    def test_exhausted_pool_times_out(self, blocking_pool):
+        from api.db_pool.base import PoolTimeout
+
+        first = blocking_pool.getconn()
+        with pytest.raises(PoolTimeout):
+            blocking_pool.getconn()
+        blocking_pool.putconn(first)
+        assert blocking_pool.getconn() is first, (
+            'Проверьте, что возвращённое соединение остаётся в пуле'
+        )
+
+    def test_waits_for_released_connection(self, blocking_pool):
+        import threading
+
+        blocking_pool.timeout = 5
+        first = blocking_pool.getconn()
+        received = []
+        waiter = threading.Thread(
+            target=lambda: received.append(blocking_pool.getconn())
+        )
+        waiter.start()
+        blocking_pool.putconn(first)
+        waiter.join(5)
+        assert received == [first], (
+            'Проверьте, что поток дожидается освободившегося соединения'
+        )
+
+
+@pytest.mark.django_db
+def test_pool_timeout_returns_503(client, monkeypatch):
+    from api.db_pool.base import PoolTimeout
+    from django.db import OperationalError, connection
+
+    def exhausted():
+        raise OperationalError('pool') from PoolTimeout('pool')
+
+    monkeypatch.setattr(connection, 'ensure_connection', exhausted)
+    response = client.get('/api/v1/categories/')
+    monkeypatch.undo()
+    assert response.status_code == 503, (
+        'Проверьте, что при исчерпанном пуле ответ 503, а не 500'
+    )
+    assert response.has_header('Retry-After')
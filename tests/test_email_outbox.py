@@ -0,0 +1,136 @@
+import datetime as dt
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('Соединение не открыто')
+
+
+class LeaseCheckingEmailBackend(BaseEmailBackend):
+    """Запоминает, были ли письма закреплены за воркером
+    на время отправки."""
+    leased = []
+
+    def send_messages(self, email_messages):
+        from reviews.models import OutgoingEmail
+
+        self.leased.append(not OutgoingEmail.objects.filter(
+            send_after__lte=timezone.now()
+        ).exists())
+        return len(email_messages)
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def signup(self, client, username='newuser'):
+        return client.post('/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@yamdb.fake'
+        })
+
+    def test_signup_only_queues_email(self, client):
+        from reviews.models import OutgoingEmail
+
+        response = self.signup(client)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'newuser@yamdb.fake'
+        assert 'confirmation code' in email.body
+
+    def test_worker_sends_batch(self, client):
+        from reviews.models import OutgoingEmail
+
+        for number in range(3):
+            self.signup(client, f'newuser{number}')
+        call_command('send_outbox_emails', batch_size=2)
+        assert len(mail.outbox) == 2
+        call_command('send_outbox_emails', batch_size=2)
+        assert len(mail.outbox) == 3
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что отправленные письма удаляются из outbox'
+        )
+
+    def test_worker_retries_with_backoff(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        self.signup(client)
+        settings.EMAIL_BACKEND = (
+            'tests.test_email_outbox.FailingEmailBackend'
+        )
+        call_command('send_outbox_emails', retry_delay=60)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.send_after > timezone.now() + dt.timedelta(seconds=50)
+
+        OutgoingEmail.objects.update(send_after=email.created)
+        call_command('send_outbox_emails', retry_delay=60)
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.send_after > timezone.now() + dt.timedelta(seconds=110), (
+            'Проверьте, что задержка перед повтором удваивается'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_outbox_emails')
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письмо не отправляется раньше send_after'
+        )
+        OutgoingEmail.objects.update(send_after=email.created)
+        call_command('send_outbox_emails', max_attempts=2)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письма после max_attempts неудач не отправляются'
+        )
+        call_command('send_outbox_emails')
+        assert len(mail.outbox) == 1
+
+    def test_unreachable_server_postpones_batch(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        for number in range(2):
+            self.signup(client, f'newuser{number}')
+        settings.EMAIL_BACKEND = (
+            'tests.test_email_outbox.UnreachableEmailBackend'
+        )
+        call_command('send_outbox_emails', retry_delay=60)
+        for email in OutgoingEmail.objects.all():
+            assert email.attempts == 1, (
+                'Проверьте, что при недоступном сервере вся пачка '
+                'откладывается с увеличением счётчика попыток'
+            )
+            assert 'SMTP' in email.last_error
+            assert email.send_after > timezone.now() + dt.timedelta(
+                seconds=50
+            )
+
+    def test_batch_is_leased_while_sending(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        self.signup(client)
+        settings.EMAIL_BACKEND = (
+            'tests.test_email_outbox.LeaseCheckingEmailBackend'
+        )
+        LeaseCheckingEmailBackend.leased.clear()
+        call_command('send_outbox_emails')
+        assert LeaseCheckingEmailBackend.leased == [True], (
+            'Проверьте, что на время отправки письма закреплены '
+            'за воркером сдвигом send_after'
+        )
+        assert not OutgoingEmail.objects.exists()
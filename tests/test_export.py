@@ -0,0 +1,92 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestCatalogueExport:
+    url = '/api/v1/export/titles/'
+
+    def read_lines(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export_requires_admin(self, client, user_client):
+        assert client.get(self.url).status_code == 401
+        assert user_client.get(self.url).status_code == 403
+
+    def test_export_streams_titles(self, admin_client, catalogue,
+                                   django_assert_max_num_queries):
+        title, review = catalogue
+        with django_assert_max_num_queries(2 * 3):
+            response = admin_client.get(self.url, {'reviews': 'true'})
+            lines = self.read_lines(response)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert len(lines) == 20
+        first = next(line for line in lines if line['id'] == title.id)
+        assert first['category']['slug'] == 'movie'
+        assert {genre['slug'] for genre in first['genre']} == {
+            'drama', 'comedy'
+        }
+        assert len(first['reviews']) == 2, (
+            'Проверьте, что отзывы выгружаются по параметру reviews'
+        )
+        assert first['rating'] == title.rating
+
+    def test_export_without_reviews(self, admin_client, title):
+        lines = self.read_lines(admin_client.get(self.url))
+        assert 'reviews' not in lines[0]
+
+    def test_export_command(self, catalogue, tmp_path):
+        output = tmp_path / 'titles.ndjson'
+        call_command('export_yamdb', output=str(output), chunk_size=7,
+                     reviews=True, stderr=StringIO())
+        lines = output.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 20, (
+            'Проверьте, что команда выгружает все произведения пачками'
+        )
+        assert sum(len(json.loads(line)['reviews']) for line in lines) == 2
+
+    def test_reviews_merged_by_title(self, catalogue, user, another_user):
+        from api.export import iter_catalogue
+        from reviews.models import Review, Title
+
+        titles = list(Title.objects.order_by('id'))
+        for title in titles[3::4]:
+            for author in (user, another_user):
+                Review.objects.create(title=title, author=author,
+                                      text='Отзыв', score=7)
+        content = ''.join(iter_catalogue(include_reviews=True,
+                                         chunk_size=3))
+        lines = [json.loads(line) for line in content.splitlines()]
+        assert [line['id'] for line in lines] == [
+            title.id for title in titles
+        ]
+        for line in lines:
+            expected = list(Review.objects.filter(
+                title_id=line['id']
+            ).order_by('pub_date', 'id').values_list('id', flat=True))
+            assert [review['id'] for review in line['reviews']] == (
+                expected
+            ), (
+                'Проверьте, что каждому произведению достаются ровно '
+                'его отзывы в порядке публикации'
+            )
+
+    def test_orphaned_reviews_skipped(self, admin_client, catalogue, user):
+        from reviews.models import Review, Title
+
+        orphan = Title.objects.create(name='Удалённое', year=2000)
+        Review.objects.create(title=orphan, author=user, text='Отзыв',
+                              score=3)
+        orphan.delete()
+        lines = self.read_lines(admin_client.get(self.url,
+                                                 {'reviews': 'true'}))
+        assert len(lines) == 20, (
+            'Проверьте, что отзывы удалённых произведений не ломают '
+            'выгрузку'
+        )
+        assert sum(len(line['reviews']) for line in lines) == 2
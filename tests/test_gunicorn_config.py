@@ -0,0 +1,59 @@
+import multiprocessing
+import os
+import runpy
+
+import pytest
+
+from .conftest import root_dir
+
+CONFIG_PATH = os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, **environ):
+    for name in ('GUNICORN_WORKER_CLASS', 'GUNICORN_WORKERS',
+                 'GUNICORN_THREADS'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONFIG_PATH)
+
+
+class TestGunicornConfig:
+
+    def test_sync_defaults(self, monkeypatch):
+        config = load_config(monkeypatch)
+        assert config['worker_class'] == 'sync'
+        assert config['workers'] == multiprocessing.cpu_count() * 2 + 1, (
+            'Проверьте, что число воркеров зависит от числа ядер'
+        )
+        assert config['threads'] == 1
+        assert config['preload_app'] is True
+        assert config['max_requests'] > 0
+        assert config['max_requests_jitter'] > 0
+
+    def test_gthread_from_environment(self, monkeypatch):
+        config = load_config(monkeypatch, GUNICORN_WORKER_CLASS='gthread',
+                             GUNICORN_THREADS='8')
+        assert config['workers'] == multiprocessing.cpu_count()
+        assert config['threads'] == 8
+
+    def test_unknown_worker_class(self, monkeypatch):
+        with pytest.raises(ValueError):
+            load_config(monkeypatch, GUNICORN_WORKER_CLASS='eventlet')
+
+    def test_dockerfile_uses_config(self):
+        with open(os.path.join(root_dir, 'api_yamdb', 'Dockerfile')) as file:
+            assert 'gunicorn.conf.py' in file.read()
+
+    def test_dead_worker_metrics_merged(self, tmp_path):
+        from api.metrics import MetricsStore, MmapedValues
+
+        MmapedValues(str(tmp_path / 'metrics_101.db')).inc('requests', 3)
+        MmapedValues(str(tmp_path / 'metrics_102.db')).inc('requests', 4)
+        store = MetricsStore(str(tmp_path))
+        store.merge(101)
+        store.merge(102)
+        assert sorted(os.listdir(tmp_path)) == ['metrics_archive.db']
+        assert store.collect()['requests'] == 7, (
+            'Проверьте, что счётчики завершившихся воркеров сохраняются'
+        )
@@ -0,0 +1,133 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportYamdb:
+
+    def write(self, path, name, content):
+        file = path / name
+        file.write_text(content, encoding='utf-8')
+        return str(file)
+
+    def write_ndjson(self, path, name, rows):
+        return self.write(
+            path, name, '\n'.join(json.dumps(row) for row in rows) + '\n'
+        )
+
+    def test_import_all_entities(self, tmp_path, user, another_user):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        categories = self.write(tmp_path, 'category.csv',
+                                'name,slug\nФильм,movie\nКнига,book\n')
+        genres = self.write(tmp_path, 'genre.csv',
+                            'name,slug\nДрама,drama\nКомедия,comedy\n')
+        titles = self.write_ndjson(tmp_path, 'titles.ndjson', [
+            {'id': number, 'name': f'Произведение {number}', 'year': 2000,
+             'category': 'movie', 'genre': ['drama', 'comedy']}
+            for number in range(1, 8)
+        ])
+        reviews = self.write(
+            tmp_path, 'review.csv',
+            'id,title_id,author,text,score,pub_date\n'
+            f'1,1,{user.username},Отлично,10,2019-09-24T21:08:21.567Z\n'
+            f'2,1,{another_user.username},Плохо,4,2019-09-25T21:08:21Z\n'
+        )
+        comments = self.write_ndjson(tmp_path, 'comments.ndjson', [
+            {'id': 1, 'review_id': 1, 'author': user.username,
+             'text': 'Согласен', 'pub_date': '2019-09-26T10:00:00Z'}
+        ])
+
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_yamdb', categories=categories,
+                         genres=genres, titles=titles, reviews=reviews,
+                         comments=comments, batch_size=3, stdout=StringIO())
+        inserts = [query for query in context.captured_queries
+                   if query['sql'].startswith('INSERT')]
+        assert len(inserts) <= 2 + 2 * 3 + 1 + 1, (
+            'Проверьте, что строки вставляются пачками, а не по одной'
+        )
+
+        assert Title.objects.count() == 7
+        assert GenreTitle.objects.count() == 14, (
+            'Проверьте, что жанры произведений связываются по slug'
+        )
+        assert Title.objects.get(id=3).category.slug == 'movie'
+        first = Title.objects.get(id=1)
+        assert (first.score_sum, first.reviews_count) == (14, 2), (
+            'Проверьте, что после импорта пересчитывается рейтинг'
+        )
+        assert Review.objects.get(id=1).pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из файла'
+        )
+        assert Comment.objects.get(id=1).author == user
+
+    def test_defer_indexes_restores_them(self, tmp_path):
+        from reviews.models import Review
+
+        genres = self.write(tmp_path, 'genre.csv', 'name,slug\nДрама,drama\n')
+        call_command('import_yamdb', genres=genres, defer_indexes=True,
+                     stdout=StringIO())
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Review._meta.db_table
+            )
+        assert 'review_title_pub_date_idx' in constraints, (
+            'Проверьте, что отложенные индексы создаются после загрузки'
+        )
+
+    def test_unknown_slugs(self, tmp_path):
+        from django.core.management.base import CommandError
+        from reviews.models import GenreTitle, Title
+
+        genres = self.write(tmp_path, 'genre.csv', 'name,slug\nДрама,drama\n')
+        titles = self.write_ndjson(tmp_path, 'titles.ndjson', [
+            {'id': 1, 'name': 'Произведение', 'year': 2000,
+             'category': 'movie', 'genre': ['drama', 'horror']}
+        ])
+        with pytest.raises(CommandError, match='movie'):
+            call_command('import_yamdb', genres=genres, titles=titles,
+                         stdout=StringIO())
+        assert not Title.objects.exists(), (
+            'Проверьте, что неизвестный slug останавливает загрузку'
+        )
+
+        stdout = StringIO()
+        call_command('import_yamdb', titles=titles, skip_unknown=True,
+                     stdout=stdout)
+        assert Title.objects.get(id=1).category is None
+        assert GenreTitle.objects.count() == 1
+        assert 'категорий 1, жанров 1, авторов 0' in stdout.getvalue(), (
+            'Проверьте, что пропущенные slug подсчитываются в отчёте'
+        )
+
+    def test_unknown_authors(self, tmp_path, user):
+        from django.core.management.base import CommandError
+        from reviews.models import Review, Title
+
+        Title.objects.create(id=1, name='Произведение', year=2000)
+        reviews = self.write(
+            tmp_path, 'review.csv',
+            'id,title_id,author,text,score\n'
+            f'1,1,{user.username},Отлично,10\n'
+            '2,1,ghost,Плохо,4\n'
+        )
+        with pytest.raises(CommandError, match='ghost'):
+            call_command('import_yamdb', reviews=reviews, stdout=StringIO())
+        assert not Review.objects.exists(), (
+            'Проверьте, что неизвестный автор останавливает загрузку'
+        )
+
+        stdout = StringIO()
+        call_command('import_yamdb', reviews=reviews, skip_unknown=True,
+                     stdout=stdout)
+        assert Review.objects.get(id=1).author == user
+        assert Review.objects.get(id=2).author is None
+        assert 'авторов 1' in stdout.getvalue(), (
+            'Проверьте, что пропущенные авторы подсчитываются в отчёте'
+        )
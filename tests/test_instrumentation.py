@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.fixture
+def slow_request_log():
+    from api.instrumentation import slow_request_log
+    slow_request_log.clear()
+    yield slow_request_log
+    slow_request_log.clear()
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+
+    def parse_server_timing(self, header):
+        metrics = {}
+        for metric in header.split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_header(self, client, settings, catalogue):
+        title, _ = catalogue
+        settings.SERVER_TIMING = True
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        metrics = self.parse_server_timing(response['Server-Timing'])
+        assert set(metrics) == {'db', 'view', 'render', 'total'}, (
+            'Проверьте, что Server-Timing разделяет базу, вью и рендеринг'
+        )
+        assert metrics['db']['desc'] == '"3 queries"'
+        assert float(metrics['total']['dur']) >= float(
+            metrics['view']['dur']
+        )
+
+    def test_server_timing_disabled(self, client, settings, title):
+        settings.SERVER_TIMING = False
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert not response.has_header('Server-Timing')
+
+    def test_slow_requests_log(self, admin_client, user_client, settings,
+                               title, slow_request_log):
+        settings.SLOW_REQUEST_THRESHOLD_MS = 0
+        admin_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        response = admin_client.get('/api/v1/slow-requests/')
+        assert response.status_code == 200
+        entry = response.json()[0]
+        assert entry['view'] == 'ReviewViewSet.list', (
+            'Проверьте, что в журнал попадает имя вьюсета и действие'
+        )
+        assert entry['slow_queries'][0]['sql'].startswith('SELECT')
+        assert user_client.get('/api/v1/slow-requests/').status_code == 403
+
+    def test_fast_requests_not_logged(self, client, settings, title,
+                                      slow_request_log):
+        settings.SLOW_REQUEST_THRESHOLD_MS = 10 ** 6
+        settings.SLOW_QUERY_THRESHOLD_MS = 10 ** 6
+        client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert not slow_request_log
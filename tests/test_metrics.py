@@ -0,0 +1,71 @@
+import pytest
+
+
+def get_samples(content):
+    samples = {}
+    for line in content.decode().splitlines():
+        if line and not line.startswith('#'):
+            series, value = line.rsplit(' ', 1)
+            samples[series] = float(value)
+    return samples
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_metrics_by_view(self, client, title):
+        from api.metrics import store
+
+        store.collect()
+        before = get_samples(client.get('/metrics').content)
+        client.get(f'/api/v1/titles/{title.id}/')
+        client.get(f'/api/v1/titles/{title.id}/')
+        client.get('/api/v1/titles/0/reviews/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        samples = get_samples(response.content)
+
+        def delta(series):
+            return samples.get(series, 0) - before.get(series, 0)
+
+        assert delta('yamdb_http_requests_total{view="TitleViewSet.retrieve",'
+                     'method="GET",status="200"}') == 2, (
+            'Проверьте, что запросы считаются по вьюсету и действию'
+        )
+        assert delta('yamdb_http_requests_total{view="ReviewViewSet.list",'
+                     'method="GET",status="404"}') == 1
+        assert delta('yamdb_http_request_duration_seconds_count'
+                     '{view="TitleViewSet.retrieve"}') == 2
+        assert delta('yamdb_db_queries_per_request_bucket'
+                     '{view="TitleViewSet.retrieve",le="+Inf"}') == 2
+        assert delta('yamdb_cache_requests_total'
+                     '{cache="response",result="hit"}') == 1, (
+            'Проверьте, что считаются попадания в кэш ответов'
+        )
+        assert 'yamdb_cache_hit_ratio{cache="response"}' in samples
+        assert not any('/metrics' in series for series in samples)
+
+    def test_mmap_store_aggregates_processes(self, tmp_path):
+        from api.metrics import MetricsStore, MmapedValues
+
+        first = MmapedValues(str(tmp_path / 'metrics_1.db'))
+        second = MmapedValues(str(tmp_path / 'metrics_2.db'))
+        # Ключей больше, чем помещается в начальный размер файла.
+        keys = [f'yamdb_series_{number}' * 3 for number in range(3000)]
+        for _ in range(3):
+            for key in keys:
+                first.inc(key, 1)
+        second.inc(keys[1], 10)
+        second.inc('other', 2.5)
+
+        totals = MetricsStore(str(tmp_path)).collect()
+        assert totals[keys[1]] == 3 + 10, (
+            'Проверьте, что значения всех процессов суммируются'
+        )
+        assert totals['other'] == 2.5
+        assert len(totals) == 3001
+
+        reopened = MmapedValues(str(tmp_path / 'metrics_1.db'))
+        reopened.inc(keys[1], 1)
+        assert MetricsStore(str(tmp_path)).collect()[keys[1]] == 14
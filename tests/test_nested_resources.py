@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestNestedResources:
+
+    def test_comment_create_queries(self, user_client, catalogue,
+                                    count_statements):
+        title, review = catalogue
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+                {'text': 'Новый комментарий'}
+            )
+        assert response.status_code == 201
+        assert count_statements(context) == 3, (
+            'Проверьте, что комментарий создаётся проверкой цепочки '
+            'родителей, вставкой и обновлением счётчика отзыва'
+        )
+        assert response.json()['author'] == 'TestUser'
+
+    def test_review_create_queries(self, admin_client, catalogue,
+                                   count_statements):
+        from reviews.models import Title
+
+        title, _ = catalogue
+        other = Title.objects.exclude(id=title.id).first()
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                f'/api/v1/titles/{other.id}/reviews/',
+                {'text': 'Отзыв', 'score': 9}
+            )
+        assert response.status_code == 201
+        assert count_statements(context) == 3, (
+            'Проверьте, что отзыв создаётся проверкой произведения, '
+            'вставкой и обновлением рейтинга'
+        )
+        other.refresh_from_db()
+        assert other.rating == 9
+
+    def test_parent_chain_checked(self, user_client, client, catalogue):
+        from reviews.models import Title
+
+        title, review = catalogue
+        other = Title.objects.exclude(id=title.id).first()
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что отзыв ищется только среди отзывов '
+            'произведения из URL'
+        )
+        assert user_client.post(url, {'text': 'Текст'}).status_code == 404
+        assert client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        ).json()['count'] == 20
+
+    def test_missing_title(self, client):
+        assert client.get('/api/v1/titles/1/reviews/').status_code == 404
@@ -0,0 +1,43 @@
+import pytest
+
+PAGE_SIZES = (5, 20)
+
+# Максимальное число SQL-запросов на одну страницу списка при любом
+# размере страницы: COUNT(*) пагинатора, сам список и, при необходимости,
+# проверка родительских объектов и prefetch жанров.
+QUERY_BUDGETS = {
+    '/api/v1/titles/': 3,
+    '/api/v1/titles/{title_id}/': 2,
+    '/api/v1/titles/{title_id}/reviews/': 3,
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/': 3,
+    '/api/v1/users/': 2,
+    '/api/v1/categories/': 2,
+    '/api/v1/genres/': 2,
+}
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('url', QUERY_BUDGETS)
+    @pytest.mark.parametrize('limit', PAGE_SIZES)
+    def test_query_budget(self, admin_client, catalogue,
+                          django_assert_max_num_queries, url, limit):
+        title, review = catalogue
+        path = url.format(title_id=title.id, review_id=review.id)
+        with django_assert_max_num_queries(QUERY_BUDGETS[url]):
+            response = admin_client.get(path, {'limit': limit})
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{path}` возвращает статус 200'
+        )
+
+    def test_title_list_does_not_grow_with_page(
+            self, admin_client, catalogue, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = admin_client.get('/api/v1/titles/', {'limit': 20})
+        results = response.json()['results']
+        assert len(results) == 20
+        assert all(len(item['genre']) == 2 for item in results), (
+            'Проверьте, что жанры произведений подгружаются через prefetch'
+        )
+        assert all(item['category']['slug'] == 'movie' for item in results)
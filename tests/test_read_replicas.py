@@ -0,0 +1,106 @@
+import pytest
+
+DATABASES = ['default', 'replica']
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.DB_REPLICA_LAG = 0
+    return 'replica'
+
+
+def settle_catalogue():
+    """Изменение каталога сдвигает версию кэша, и свежие ответы
+    строятся по основной базе. Версия отодвигается в прошлое, будто
+    реплика уже догнала основную базу."""
+    from api.cache import CATALOGUE_VERSION_KEY, get_cache
+
+    get_cache().set(CATALOGUE_VERSION_KEY, 1, None)
+
+
+class TestReplicaRouter:
+
+    def test_reads_follow_writes_to_primary(self, replica):
+        from api import replicas
+        from api.replicas import ReplicaRouter
+        from reviews.models import Title
+
+        router = ReplicaRouter()
+        replicas.reset()
+        assert router.db_for_read(Title) == 'default', (
+            'Проверьте, что без use_replica чтения идут в основную базу'
+        )
+        replicas.use_replica()
+        assert router.db_for_read(Title) == replica
+        assert router.db_for_write(Title) == 'default'
+        assert router.db_for_read(Title) == 'default', (
+            'Проверьте, что после записи запрос читает из основной базы'
+        )
+        replicas.reset()
+
+    def test_replica_not_migrated(self, replica):
+        from api.replicas import ReplicaRouter
+
+        router = ReplicaRouter()
+        assert router.allow_migrate('default', 'reviews')
+        assert not router.allow_migrate(replica, 'reviews')
+
+
+@pytest.mark.django_db(transaction=True, databases=DATABASES)
+class TestReplicaReads:
+
+    def test_safe_methods_read_replica(self, client, replica):
+        from reviews.models import Category, Review, Title, User
+
+        Category.objects.create(name='Основная', slug='primary')
+        Category.objects.using(replica).create(name='Реплика',
+                                               slug='replica')
+        title = Title.objects.using(replica).create(name='Только в реплике',
+                                                    year=2000)
+        author = User.objects.using(replica).create(
+            username='reader', email='reader@yamdb.fake'
+        )
+        Review.objects.using(replica).create(title=title, author=author,
+                                             text='Отзыв', score=5)
+        settle_catalogue()
+
+        response = client.get('/api/v1/categories/')
+        assert [category['slug'] for category
+                in response.json()['results']] == ['replica'], (
+            'Проверьте, что список категорий читается из реплики'
+        )
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    def test_writer_reads_own_writes(self, settings, user_client, client,
+                                     replica):
+        from reviews.models import Review, Title
+
+        settings.DB_REPLICA_LAG = 60
+        title = Title.objects.create(name='Произведение', year=2000)
+        Title.objects.using(replica).create(id=title.id, name=title.name,
+                                            year=title.year)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert not Review.objects.using(replica).exists()
+
+        assert user_client.get(url).json()['count'] == 1, (
+            'Проверьте, что автор записи читает из основной базы, '
+            'пока реплика может отставать'
+        )
+        assert client.get(url).json()['count'] == 0
+
+    def test_cache_filled_from_primary_after_change(self, settings, client,
+                                                    replica):
+        from reviews.models import Title
+
+        settings.DB_REPLICA_LAG = 60
+        Title.objects.create(name='Новинка', year=2021)
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что сразу после изменения каталога кэш '
+            'заполняется данными основной базы'
+        )
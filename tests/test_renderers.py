@@ -0,0 +1,78 @@
+import datetime as dt
+import io
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+DATA = {
+    'id': 1,
+    'name': 'Произведение\u2028с разделителем',
+    'rating': Decimal('7.5'),
+    'pub_date': dt.datetime(2021, 5, 1, 12, 30, tzinfo=timezone.utc),
+    'day': dt.date(2021, 5, 1),
+    'message': gettext_lazy('Not found.'),
+    'genre': [{'name': 'Драма', 'slug': 'drama'}],
+    'count': None,
+}
+
+
+class TestFastJSON:
+
+    @pytest.mark.parametrize('backend', ['orjson', 'json'])
+    def test_output_matches_drf(self, settings, backend):
+        from api.renderers import FastJSONRenderer
+
+        settings.JSON_BACKEND = backend
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), 'Проверьте, что вывод совпадает с JSONRenderer DRF'
+
+    def test_indent_uses_stdlib(self):
+        from api.renderers import FastJSONRenderer
+
+        content = FastJSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+        assert content == JSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+
+    def test_parser(self, settings):
+        from api.renderers import FastJSONParser
+
+        settings.JSON_BACKEND = 'orjson'
+        parser = FastJSONParser()
+        assert parser.parse(
+            io.BytesIO('{"text": "Отзыв", "score": 7}'.encode())
+        ) == {'text': 'Отзыв', 'score': 7}
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b'{"score": NaN}'))
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b'{"text": '))
+
+    def test_configured_for_api(self):
+        from rest_framework.settings import api_settings
+
+        assert api_settings.DEFAULT_RENDERER_CLASSES[0].__name__ == (
+            'FastJSONRenderer'
+        )
+        assert api_settings.DEFAULT_PARSER_CLASSES[0].__name__ == (
+            'FastJSONParser'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_json_command():
+    from django.core.management import call_command
+
+    output = io.StringIO()
+    call_command('bench_json', items=5, repeat=2, stdout=output)
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 4, (
+        'Проверьте, что для страниц произведений и отзывов выводятся '
+        'замеры обоих рендереров'
+    )
@@ -0,0 +1,83 @@
+import pytest
+
+BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+@pytest.fixture(params=BACKENDS)
+def cache_backend(request, settings, tmp_path):
+    settings.CACHES = dict(settings.CACHES, default={
+        'BACKEND': request.param,
+        'LOCATION': str(tmp_path / 'cache'),
+    })
+    return request.param
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_repeated_get_hits_cache(self, cache_backend, client, catalogue,
+                                     django_assert_num_queries):
+        first = client.get('/api/v1/titles/', {'limit': 5})
+        assert first.status_code == 200
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/', {'limit': 5})
+        assert second.content == first.content
+        assert second['ETag'] == first['ETag']
+
+    def test_query_string_is_normalized(self, cache_backend, client,
+                                        catalogue, django_assert_num_queries):
+        client.get('/api/v1/titles/', {'limit': 5, 'offset': 5})
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/?offset=5&limit=5')
+        assert response.status_code == 200
+
+    def test_conditional_requests(self, cache_backend, client, catalogue):
+        response = client.get('/api/v1/categories/')
+        assert response.has_header('Last-Modified')
+        not_modified = client.get('/api/v1/categories/',
+                                  HTTP_IF_NONE_MATCH=response['ETag'])
+        assert not_modified.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается статус 304'
+        )
+        not_modified = client.get(
+            '/api/v1/categories/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert not_modified.status_code == 304
+
+    def test_html_is_not_shared(self, cache_backend, client, admin_client,
+                                catalogue):
+        admin_page = admin_client.get('/api/v1/titles/',
+                                      HTTP_ACCEPT='text/html')
+        assert admin_page.status_code == 200
+        assert 'TestAdmin' in admin_page.content.decode()
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT='text/html')
+        page = response.content.decode()
+        assert 'TestAdmin' not in page and 'csrfmiddlewaretoken' not in page, (
+            'Проверьте, что страница браузерного API одного пользователя '
+            'не отдаётся из кэша другим'
+        )
+
+    def test_review_invalidates_title(self, cache_backend, client,
+                                      user_client, catalogue):
+        from reviews.models import Title
+
+        title = Title.objects.filter(reviews__isnull=True).first()
+        url = f'/api/v1/titles/{title.id}/'
+        before = client.get(url)
+        user_client.post(f'{url}reviews/', {'text': 'Отзыв', 'score': 9})
+        after = client.get(url)
+        assert after.json()['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+        assert after['ETag'] != before['ETag']
+
+    def test_genre_change_invalidates_list(self, cache_backend, client,
+                                           admin_client, catalogue):
+        before = client.get('/api/v1/genres/').json()['count']
+        admin_client.post('/api/v1/genres/',
+                          {'name': 'Триллер', 'slug': 'thriller'})
+        assert client.get('/api/v1/genres/').json()['count'] == before + 1
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_fields(self, client, catalogue):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/',
+                                  {'fields': 'id,name,rating'})
+        assert response.status_code == 200
+        assert all(set(item) == {'id', 'name', 'rating'}
+                   for item in response.json()['results']), (
+            'Проверьте, что ?fields= оставляет в ответе только '
+            'перечисленные поля'
+        )
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        assert 'description' not in sql, (
+            'Проверьте, что невостребованные колонки не выбираются'
+        )
+        assert 'reviews_category' not in sql and 'genre' not in sql, (
+            'Проверьте, что JOIN и prefetch незапрошенных связей '
+            'пропускаются'
+        )
+
+    def test_titles_omit(self, client, catalogue):
+        response = client.get('/api/v1/titles/',
+                              {'omit': 'description,genre'})
+        item = response.json()['results'][0]
+        assert set(item) == {'id', 'name', 'year', 'rating',
+                             'reviews_count', 'category'}
+        assert item['category']['slug'] == 'movie'
+
+    def test_reviews_without_text(self, client, catalogue,
+                                  django_assert_num_queries):
+        title, _ = catalogue
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.id}/reviews/',
+                                  {'fields': 'id,score'})
+        assert [set(item) for item in response.json()['results']] == [
+            {'id', 'score'}, {'id', 'score'}
+        ]
+
+    def test_comments_cursor(self, client, catalogue,
+                             django_assert_max_num_queries):
+        title, review = catalogue
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        with django_assert_max_num_queries(3):
+            response = client.get(url, {'cursor': '', 'limit': 5,
+                                        'fields': 'id,author'})
+        data = response.json()
+        assert data['next'], (
+            'Проверьте, что курсор строится без лишних запросов'
+        )
+        assert all(set(item) == {'id', 'author'}
+                   for item in data['results'])
+
+    def test_users_fields(self, admin_client, user):
+        response = admin_client.get('/api/v1/users/',
+                                    {'fields': 'username,role'})
+        assert all(set(item) == {'username', 'role'}
+                   for item in response.json()['results'])
+
+    def test_write_returns_all_fields(self, user_client, title):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/?fields=id',
+            {'text': 'Отзыв', 'score': 8}
+        )
+        assert response.status_code == 201
+        assert {'id', 'text', 'author', 'score', 'pub_date'} <= set(
+            response.json()
+        )
@@ -0,0 +1,145 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = dict(
+        settings.REST_FRAMEWORK,
+        DEFAULT_THROTTLE_RATES={'signup.ip': '2/min', 'token.ip': '2/min',
+                                'comment.user': '2/min',
+                                'comment.ip': '100/min'},
+    )
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_signup_limited_per_ip(self, client, rates):
+        statuses = [
+            client.post('/api/v1/auth/signup/',
+                        {'username': f'user{number}',
+                         'email': f'user{number}@yamdb.fake'}).status_code
+            for number in range(3)
+        ]
+        assert statuses == [200, 200, 429], (
+            'Проверьте, что регистрация ограничена по IP'
+        )
+        response = client.post('/api/v1/auth/signup/',
+                               {'username': 'other',
+                                'email': 'other@yamdb.fake'},
+                               REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == 200, (
+            'Проверьте, что у другого адреса своё ведро'
+        )
+
+    def test_throttled_response_has_retry_after(self, client, rates):
+        for _ in range(2):
+            client.post('/api/v1/auth/token/', {})
+        response = client.post('/api/v1/auth/token/', {})
+        assert response.status_code == 429
+        assert 0 < int(response['Retry-After']) <= 60
+
+    def test_comment_create_limited_per_user(self, user_client,
+                                             another_user_client, client,
+                                             catalogue, rates):
+        title, review = catalogue
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        statuses = [user_client.post(url, {'text': 'Текст'}).status_code
+                    for _ in range(3)]
+        assert statuses == [201, 201, 429]
+        assert another_user_client.post(
+            url, {'text': 'Текст'}
+        ).status_code == 201
+        assert client.get(url).status_code == 200, (
+            'Проверьте, что чтение комментариев не ограничивается'
+        )
+
+    def test_bucket_refills(self, rates, monkeypatch):
+        from api.throttling import IPTokenBucketThrottle
+        from rest_framework.test import APIRequestFactory
+
+        now = [1000.0]
+        monkeypatch.setattr(IPTokenBucketThrottle, 'timer',
+                            lambda self: now[0])
+
+        class View:
+            throttle_scope = 'signup'
+
+        request = APIRequestFactory().post('/')
+        throttle = IPTokenBucketThrottle()
+        assert throttle.allow_request(request, View)
+        assert throttle.allow_request(request, View)
+        assert not throttle.allow_request(request, View)
+        assert throttle.wait() == pytest.approx(30)
+        now[0] += 30
+        assert throttle.allow_request(request, View), (
+            'Проверьте, что ведро пополняется со временем'
+        )
+        assert not throttle.allow_request(request, View)
+
+
+@pytest.mark.django_db
+class TestLoadShedding:
+
+    def test_long_queue_sheds(self, client, settings):
+        settings.LOAD_SHED_QUEUE_MS = 500
+        response = client.get('/api/v1/categories/',
+                              HTTP_X_REQUEST_START=f't={time.time() - 2}')
+        assert response.status_code == 503
+        assert response['Retry-After']
+        assert client.get(
+            '/api/v1/categories/',
+            HTTP_X_REQUEST_START=f't={time.time():.3f}'
+        ).status_code == 200
+        assert client.get(
+            '/health/ready',
+            HTTP_X_REQUEST_START=f't={time.time() - 2}'
+        ).status_code == 200
+
+    def test_exhausted_pool_sheds(self, client, monkeypatch,
+                                  django_assert_num_queries):
+        from django.db import connection
+
+        monkeypatch.setattr(connection, 'get_pool_stats',
+                            lambda: {'size': 4, 'in_use': 4}, raising=False)
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == 503, (
+            'Проверьте, что при занятом пуле запрос отклоняется '
+            'до обращения к базе'
+        )
+
+
+@pytest.mark.django_db
+def test_buckets_survive_response_cache_culling(client, rates, settings,
+                                                tmp_path):
+    """Вёдра в настроенном кэше throttle не вытесняются записями кэша
+    ответов, которые клиент создаёт произвольными строками запроса."""
+    import importlib
+    import os
+
+    configured = importlib.import_module(
+        os.environ['DJANGO_SETTINGS_MODULE']
+    ).CACHES
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        },
+        'throttle': dict(configured['throttle'],
+                         LOCATION=str(tmp_path / 'throttle')),
+    }
+
+    def signup(number):
+        return client.post('/api/v1/auth/signup/',
+                           {'username': f'user{number}',
+                            'email': f'user{number}@yamdb.fake'}).status_code
+
+    assert [signup(number) for number in range(3)] == [200, 200, 429]
+    for offset in range(600):
+        client.get('/api/v1/genres/', {'limit': 1, 'offset': offset})
+    assert signup(3) == 429, (
+        'Проверьте, что вытеснение кэша ответов не сбрасывает лимиты'
+    )
@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleRating:
+
+    def reviews_url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/'
+
+    def get_rating(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        return response.json()['rating']
+
+    def test_rating_follows_reviews(self, user_client, another_user_client,
+                                    title):
+        assert self.get_rating(user_client, title) is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен None'
+        )
+        response = user_client.post(self.reviews_url(title),
+                                    {'text': 'Отлично', 'score': 10})
+        assert response.status_code == 201
+        review_id = response.json()['id']
+        another_user_client.post(self.reviews_url(title),
+                                 {'text': 'Неплохо', 'score': 5})
+        assert self.get_rating(user_client, title) == 7
+
+        user_client.patch(f'{self.reviews_url(title)}{review_id}/',
+                          {'score': 1})
+        assert self.get_rating(user_client, title) == 3
+
+        user_client.delete(f'{self.reviews_url(title)}{review_id}/')
+        assert self.get_rating(user_client, title) == 5
+
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (5, 1)
+
+    def test_duplicate_review_keeps_totals(self, user_client, title):
+        user_client.post(self.reviews_url(title),
+                         {'text': 'Отлично', 'score': 10})
+        response = user_client.post(self.reviews_url(title),
+                                    {'text': 'Ещё раз', 'score': 1})
+        assert response.status_code == 400
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (10, 1)
+
+    def test_recalculate_ratings(self, user, another_user, title):
+        from reviews.models import Review, Title
+
+        Review.objects.create(title=title, author=user, text='a', score=8)
+        Review.objects.create(title=title, author=another_user, text='b',
+                              score=4)
+        Title.objects.filter(id=title.id).update(score_sum=0,
+                                                 reviews_count=0)
+
+        call_command('recalculate_ratings', batch_size=1)
+
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (12, 2)
+        assert title.rating == 6
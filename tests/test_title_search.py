@@ -0,0 +1,68 @@
+import pytest
+
+
+@pytest.fixture
+def searchable_titles(category, genres):
+    from reviews.models import Genre, Title
+
+    Genre.objects.create(name='Драматическая комедия', slug='dramedy')
+    titles = {
+        'ring': Title.objects.create(
+            name='Властелин колец', year=2001, category=category,
+            description='Хоббиты несут кольцо в Мордор'
+        ),
+        'hobbit': Title.objects.create(
+            name='Хоббит', year=2012, category=category,
+            description='Путешествие туда и обратно'
+        ),
+        'matrix': Title.objects.create(
+            name='Матрица', year=1999, category=category,
+            description='Красная или синяя таблетка'
+        ),
+    }
+    titles['ring'].genres.set([genres[0]])
+    titles['hobbit'].genres.set(
+        [Genre.objects.get(slug='dramedy')]
+    )
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def get_ids(self, client, **params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200
+        return [item['id'] for item in response.json()['results']]
+
+    def test_search_ranks_name_and_description(self, client,
+                                               searchable_titles):
+        ids = self.get_ids(client, search='хоббит')
+        assert ids == [searchable_titles['hobbit'].id,
+                       searchable_titles['ring'].id], (
+            'Проверьте, что поиск идёт по названию и описанию, '
+            'а совпадение в названии ранжируется выше'
+        )
+
+    def test_search_tolerates_syntax(self, client, searchable_titles):
+        assert self.get_ids(client, search='"матр*') == [
+            searchable_titles['matrix'].id
+        ]
+        assert self.get_ids(client, search='!!!') == []
+
+    def test_search_follows_updates(self, client, searchable_titles):
+        matrix = searchable_titles['matrix']
+        matrix.description = 'Кольцо'
+        matrix.save()
+        assert matrix.id in self.get_ids(client, search='кольцо')
+
+    def test_slug_filters(self, client, searchable_titles):
+        assert self.get_ids(client, genre='drama') == [
+            searchable_titles['ring'].id
+        ], 'Проверьте, что фильтр genre ищет точное совпадение slug'
+        assert sorted(self.get_ids(client, genre__startswith='dram')) == [
+            searchable_titles['ring'].id, searchable_titles['hobbit'].id
+        ]
+        assert len(self.get_ids(client, category='movie')) == 3
+        assert self.get_ids(client, category='mov') == []
+        assert len(self.get_ids(client, category__startswith='mov')) == 3
@@ -0,0 +1,90 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def jwt_client(user):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+@pytest.mark.django_db
+class TestUserCache:
+
+    def test_second_request_skips_user_query(self, user, title, user_cache,
+                                             django_assert_num_queries):
+        client = jwt_client(user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        client.get(url)
+        assert user_cache.stats()['misses'] == 1
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert user_cache.stats()['hits'] == 1, (
+            'Проверьте, что повторный запрос берёт пользователя из кэша'
+        )
+
+    def test_cached_user_can_write(self, user, title):
+        client = jwt_client(user)
+        client.get('/api/v1/users/me/')
+        response = client.post(f'/api/v1/titles/{title.id}/reviews/',
+                                {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+
+    def test_me_returns_full_profile(self, user):
+        user.bio = 'Биография'
+        user.save()
+        client = jwt_client(user)
+        client.get('/api/v1/users/me/')
+        response = client.patch('/api/v1/users/me/', {'first_name': 'Имя'})
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'Биография'
+        assert response.json()['first_name'] == 'Имя'
+
+    def test_role_change_invalidates(self, user, admin_client):
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        admin_client.patch(f'/api/v1/users/{user.username}/',
+                           {'role': 'admin'})
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+
+    def test_deactivated_user_is_rejected(self, user):
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_change_in_other_worker_invalidates(self, user, user_cache):
+        from api.authentication import USER_CHANGED_KEY
+        from django.core.cache import cache
+        from reviews.models import User
+
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        # Другой воркер меняет роль: локальный кэш этого процесса
+        # не трогается, меняется только версия в общем кэше.
+        User.objects.filter(id=user.id).update(role='admin')
+        cache.set(USER_CHANGED_KEY.format(user.id), 1.0)
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что изменение пользователя в другом воркере '
+            'сбрасывает его запись в кэше этого процесса'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_save_publishes_change(user):
+    from api.authentication import USER_CHANGED_KEY
+    from django.core.cache import cache
+
+    user.role = 'admin'
+    user.save()
+    assert cache.get(USER_CHANGED_KEY.format(user.id)) is not None, (
+        'Проверьте, что после коммита изменение пользователя '
+        'публикуется в общем кэше для остальных воркеров'
+    )